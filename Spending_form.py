@@ -1,96 +1,172 @@
+import os
 import re
+import time
+from contextlib import contextmanager
+from functools import partial
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from datetime import datetime, timedelta
+from datetime import datetime
 import pandas as pd
 import altair as alt
+from writequeue import WriteQueue
+from importer import Importer
+from backend import WorksheetPool, ledger_configs
+from storage import SQLiteStorage, SheetsStorage, StorageMirror, sync_storage
+from instrument import profiler
+from ledger import Refresher, SheetSync, api_calls, date_str, week_str, month_str
+from budgets import ledger_budgets
+from dashboard import (budget_alerts, budget_status, budget_usage, last_purchases, monthly_trend, purchase_categories,
+                       today_breakdown, today_transactions, warm, weekly_chart_data)
 
 # --- CONFIG ---
 st.set_page_config(page_title="Spending Tracker", layout="wide")
 
-# --- CATEGORY BUDGETS ---
-category_budgets = {
-    "Bet": 3000,
-    "Bill": 35000,
-    "Data": 11000,
-    "Food": 40000,
-    "Foodstuff": 150000,
-    "Money": 10000,
-    "Object": 50000,
-    "Snacks": 60000,
-    "transfer": 300000,
-    "income": 250000,
-    "Airtime": 1000,
-    "transport": 70000,
-    "Savings": 400000,
-}
-
 # --- GOOGLE SHEETS AUTH ---
-creds_dict = dict(st.secrets["gcp_service_account"])
-scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-credentials = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-gc = gspread.authorize(credentials)
-sheet = gc.open_by_url("https://docs.google.com/spreadsheets/d/1Pugi_cuQw25_GsGpVQAyzjWuuOFRLmP8yGKaIb6unD0/edit?gid=359073504#gid=359073504")
-Spending_Sheet = sheet.worksheet("My Spending Sheet")
+@st.cache_resource
+def get_worksheet_pool():
+    # Shared by every session: authorizes once per process and caches worksheet handles
+    return WorksheetPool(st.secrets["gcp_service_account"])
+
+def get_worksheet(name):
+    config = ledger_configs(st.secrets)[name]
+    return get_worksheet_pool().worksheet(config["url"], config["worksheet"])
+
+ledger_names = list(ledger_configs(st.secrets))
+requested = st.query_params.get("ledger")
+ledger_name = st.sidebar.selectbox(
+    "👤 Ledger", ledger_names,
+    index=ledger_names.index(requested) if requested in ledger_names else 0,
+    disabled=len(ledger_names) == 1,
+)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_budgets(name):
+    # The ledger's budgets tab if it has one, else its budgets table in secrets, else the defaults,
+    # with the tab rows that had to be skipped
+    return ledger_budgets(ledger_configs(st.secrets)[name], lambda url, tab: get_worksheet_pool().worksheet(url, tab))
+
+budgets, budget_problems = get_budgets(ledger_name)
+for problem in budget_problems:
+    st.sidebar.warning(f"⚠️ {problem}")
 
 # --- DATA HELPERS ---
-def get_today_count():
-    today = datetime.now()
-    today_str = f"{today.month}/{today.day}/{today.year}"
-    all_data = Spending_Sheet.get_all_records(expected_headers=["DATE", "No", "TIME", "ITEM", "ITEM CATEGORY", "No of ITEM", "Amount Spent", "WEEK", "MONTH"])
-    return len([row for row in all_data if row.get("DATE") == today_str])
-
-def get_total_amount_by_period(key, value):
-    all_data = Spending_Sheet.get_all_records(expected_headers=["DATE", "No", "TIME", "ITEM", "ITEM CATEGORY", "No of ITEM", "Amount Spent", "WEEK", "MONTH"])
-    return sum(float(row.get("Amount Spent", 0)) for row in all_data if row.get(key) == value and row.get("ITEM CATEGORY", "").lower() not in ["savings", "income"])
-
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+@st.cache_resource
+def get_storage(name):
+    # Where the ledger is read from and written to: the sheet itself, or local SQLite mirrored to it
+    config = ledger_configs(st.secrets)[name]
+    if config["storage"] != "sqlite":
+        return get_worksheet(name)
+    local = SQLiteStorage(config["sqlite_path"] or os.path.join(CACHE_DIR, name, "ledger.sqlite3"))
+    if local.row_count() == 0:
+        sync_storage(SheetsStorage(get_worksheet(name)), local)
+    return local
+
+@st.cache_resource
+def get_mirror(name):
+    storage = get_storage(name)
+    if not isinstance(storage, SQLiteStorage):
+        return None
+    return StorageMirror(storage, SheetsStorage(get_worksheet(name)))
+
+@st.cache_resource
+def get_sheet_sync(name):
+    sync = SheetSync(get_storage(name), cache_path=os.path.join(CACHE_DIR, name, "ledger.parquet"))
+    # Warm start: serve the on-disk copy now and catch up with the sheet in the background
+    if sync.load_cache():
+        sync.refresh_in_background()
+    return sync
+
+@st.cache_resource
+def get_write_queue(name):
+    sync, mirror = get_sheet_sync(name), get_mirror(name)
+
+    def on_flushed(rows, updated_range):
+        sync.confirm_flushed(rows, updated_range)
+        if mirror:
+            mirror.wake()
+    queue = WriteQueue(os.path.join(CACHE_DIR, name, "pending.sqlite3"), get_storage(name), on_flushed=on_flushed)
+    # Rows journaled before a restart are shown again until the worker has flushed them
+    sync.add_pending([row for _, row in queue.pending_rows()])
+    queue.start()
+    return queue
+
+@st.cache_resource
+def get_refresher(name):
+    # Pulls sheet changes in the background, so reruns never wait on a sync
+    return Refresher(get_sheet_sync(name), interval=ledger_configs(st.secrets)[name]["refresh_interval"])
+
+@profiler.timed("load_ledger")
+def load_ledger():
+    # Latest complete snapshot of the shared ledger, straight from memory: the refresher keeps
+    # it current, and a render that finds it stale anyway starts a background refresh
+    get_refresher(ledger_name)
+    sync = get_sheet_sync(ledger_name)
+    # Refreshes build this page's chart data on every new snapshot before swapping it in
+    sync.prepare = partial(warm, budgets=budgets)
+    return sync.get(max_age=600)
+
+@profiler.timed("next_number")
+def get_transaction_number(day):
+    # Next "No" for that day from the shared per-day allocator; safe under concurrent submits
+    return get_sheet_sync(ledger_name).next_number(day)
+
+@profiler.timed("metrics.today")
 def get_today_total_amount():
-    return get_total_amount_by_period("DATE", f"{datetime.now().month}/{datetime.now().day}/{datetime.now().year}")
+    return ledger.today_total()
 
+@profiler.timed("metrics.week")
 def get_weekly_total_amount():
-    week_str = f"{(datetime.now() - timedelta(days=datetime.now().weekday())).day}-{datetime.now().strftime('%b')}"
-    return get_total_amount_by_period("WEEK", week_str)
+    return ledger.weekly_total()
 
+@profiler.timed("metrics.month")
 def get_monthly_total_amount():
-    return get_total_amount_by_period("MONTH", datetime.now().strftime("%B %Y"))
-
-@st.cache_data(ttl=3600)
-def load_item_category_map():
-    all_data = Spending_Sheet.get_all_records(expected_headers=["DATE", "No", "TIME", "ITEM", "ITEM CATEGORY", "No of ITEM", "Amount Spent", "WEEK", "MONTH"])
-    return {row["ITEM"].strip().lower(): row["ITEM CATEGORY"].strip() for row in all_data if row["ITEM"] and row["ITEM CATEGORY"]}
-
-@st.cache_data(ttl=600)
-def load_all_data():
-    return Spending_Sheet.get_all_records(expected_headers=["DATE", "No", "TIME", "ITEM", "ITEM CATEGORY", "No of ITEM", "Amount Spent", "WEEK", "MONTH"])
+    return ledger.monthly_total()
+
+# --- SECTION TIMINGS ---
+section_timings = st.session_state.setdefault("section_timings", {})
+show_timings = st.sidebar.toggle("⏱️ Show section timings")
+# Profiling is process-wide: turning it on records spans for every session until turned off
+st.sidebar.toggle(
+    "📈 Profiling", value=profiler.enabled, key="profiling",
+    on_change=lambda: setattr(profiler, "enabled", st.session_state["profiling"]),
+)
+lap_start = time.perf_counter()
+
+def lap(name):
+    # Time since the previous lap, for the sections of the full top-to-bottom run
+    global lap_start
+    now = time.perf_counter()
+    section_timings[name] = (now - lap_start) * 1000
+    if profiler.enabled:
+        profiler.record(f"section.{name}", section_timings[name])
+    lap_start = now
+
+@contextmanager
+def timed(name):
+    # For fragments, which rerun on their own and report their timing inline
+    start = time.perf_counter()
+    yield
+    section_timings[name] = (time.perf_counter() - start) * 1000
+    if profiler.enabled:
+        profiler.record(f"section.{name}", section_timings[name])
+    if show_timings:
+        st.caption(f"⏱️ {name}: {section_timings[name]:.1f} ms")
 
 # --- LOAD DATA ---
-item_category_map = load_item_category_map()
-all_data = load_all_data()
-df = pd.DataFrame(all_data)
-df["Amount Spent"] = pd.to_numeric(df["Amount Spent"], errors="coerce")
+# One sheet download per rerun at most; everything below reads from this snapshot
+api_calls.reset()
+ledger = load_ledger()
+write_queue = get_write_queue(ledger_name)
+lap("Load data")
 
 # --- Recommendation: Items likely to buy today based on past weekday purchases ---
-def recommend_items_for_today(df, top_n=5):
-    if df.empty:
-        return []
-    if "DATE" not in df or "ITEM" not in df:
-        return []
-    
-    # Convert DATE to datetime
-    df["DATE_dt"] = pd.to_datetime(df["DATE"], format="%m/%d/%Y", errors='coerce')
-    # Get today's weekday string
-    today_weekday = datetime.now().strftime("%A")
-    # Add weekday column
-    df["Weekday"] = df["DATE_dt"].dt.day_name()
-    # Filter to transactions on same weekday
-    df_today_weekday = df[df["Weekday"] == today_weekday]
-    # Count items frequency
-    item_counts = df_today_weekday["ITEM"].str.strip().value_counts()
-    # Return top N items as list
-    return item_counts.head(top_n).index.tolist()
-
-likely_items = recommend_items_for_today(df)
+@profiler.timed("recommend_items_for_today")
+def recommend_items_for_today(ledger, top_n=5):
+    # Served from per-weekday counters the ledger keeps up to date; nothing is recomputed here
+    return ledger.likely_items(top_n=top_n)
+
+likely_items = recommend_items_for_today(ledger)
 
 # --- METRICS ---
 st.title("💸 Spending Tracker")
@@ -98,39 +174,60 @@ with st.container():
     col1, col2, col3 = st.columns(3)
     col1.metric("🗓️ Today", f"₦{get_today_total_amount():,.2f}")
     col2.metric("📅 This Week", f"₦{get_weekly_total_amount():,.2f}")
-    col3.metric("📆 This Month", f"₦{get_monthly_total_amount():,.2f}")
+    total_month = get_monthly_total_amount()
+    col3.metric("📆 This Month", f"₦{total_month:,.2f}")
+lap("Metrics")
 st.markdown("---")  # Divider line
 
 # --- TOTAL PROGRESS ---
-total_month = get_monthly_total_amount()
-total_budget = sum(b for k, b in category_budgets.items() if k.lower() not in ["savings", "income"])
-percent_used = total_month / total_budget if total_budget > 0 else 0
+total_month, total_budget, percent_used = budget_usage(ledger, budgets)
 
 st.markdown("### 🏁 Monthly Budget Usage")
 st.progress(min(percent_used, 1.0), text=f"₦{total_month:,.0f} of ₦{total_budget:,.0f} used ({percent_used*100:.1f}%)")
+status = budget_status(ledger, budgets)
+alerts = budget_alerts(status)
+if alerts:
+    with st.expander(f"🚨 Budget alerts ({len(alerts)})", expanded=(status["Status"] == "over").any()):
+        for alert in alerts:
+            st.warning(f"⚠️ {alert}")
+lap("Budget usage")
 st.markdown("---")  # Divider line
 
+# Recommendation and suggestion buttons fill the item box through a callback, which runs
+# before the box is drawn again
+def set_item(name):
+    st.session_state["item_input"] = name
+
 # --- Show recommendations ---
 if likely_items:
     st.markdown("### 🛒 Items You Might Buy Today (based on past purchases)")
     cols = st.columns(len(likely_items))
     for idx, recommended_item in enumerate(likely_items):
-        if cols[idx].button(recommended_item):
-            st.session_state["prefill_item"] = recommended_item
+        cols[idx].button(recommended_item, on_click=set_item, args=(recommended_item,))
+lap("Recommendations")
 st.markdown("---")  # Divider line
 # --- INPUT FORM ---
-with st.form("entry_form", clear_on_submit=True):
-    st.markdown("### ✍️ Add New Transaction")
+st.markdown("### ✍️ Add New Transaction")
+# The item box sits outside the form so completions and the predicted category update as it
+# is filled in (widgets inside a form only rerun on submit)
+if st.session_state.pop("clear_item", False):
+    st.session_state["item_input"] = ""
+item = st.text_input("🛒 Item", key="item_input").strip()
+predicted = (ledger.items.predict(item) or "").lower() if item else ""
+predicted_category = next((c for c in budgets if c.lower() == predicted), None)
+suggestions = [s for s in ledger.items.complete(item, n=5) if s.lower() != item.lower()] if item else []
+if suggestions:
+    cols = st.columns(len(suggestions))
+    for idx, suggestion in enumerate(suggestions):
+        cols[idx].button(suggestion, key=f"suggest_{idx}", on_click=set_item, args=(suggestion,))
+if predicted_category:
+    st.caption(f"📂 Usually filed under **{predicted_category}**; it is preselected below, change it if that's wrong.")
 
+with st.form("entry_form", clear_on_submit=True):
     selected_date = st.date_input("📆 Date", datetime.today())
     time_input = st.text_input("⏰ Time (e.g. 14:30 or 14:30:00)")
 
-    # Use prefill if user clicked recommended button
-    prefill_item = st.session_state.get("prefill_item", "")
-    item = st.text_input("🛒 Item", value=prefill_item).strip()
-
-    predicted_category = item_category_map.get(item.lower(), "Select Category")
-    category_options = ["Select Category"] + list(category_budgets.keys())
+    category_options = ["Select Category"] + list(budgets.keys())
     default_index = category_options.index(predicted_category) if predicted_category in category_options else 0
     category = st.selectbox("📂 Category", category_options, index=default_index)
 
@@ -148,109 +245,174 @@ with st.form("entry_form", clear_on_submit=True):
         elif not item:
             st.warning("⚠️ Item name is required.")
         else:
-            transaction_id = get_today_count() + 1
-            monday_str = f"{(datetime.now() - timedelta(days=datetime.now().weekday())).day}-{datetime.now().strftime('%b')}"
-            month_str = datetime.now().strftime("%B %Y")
+            transaction_id = get_transaction_number(selected_date)
 
             new_row = [
-                f"{selected_date.month}/{selected_date.day}/{selected_date.year}",
+                date_str(selected_date),
                 transaction_id,
                 time_input,
                 item,
                 category,
                 qty,
                 amount,
-                monday_str,
-                month_str
+                week_str(datetime.now()),
+                month_str(datetime.now())
             ]
 
-            Spending_Sheet.append_row(new_row)
-            st.cache_data.clear()
+            get_sheet_sync(ledger_name).add_pending([new_row], journal=write_queue.submit)
             st.success("✅ Transaction submitted!")
-            # Clear prefill after submit
-            if "prefill_item" in st.session_state:
-                del st.session_state["prefill_item"]
+            # Clear the item box on the next run (it is outside the form, so clear_on_submit misses it)
+            st.session_state["clear_item"] = True
+
+# --- BULK IMPORT ---
+with st.expander("📥 Import transactions from CSV"):
+    st.caption("A ledger export or bank statement with date, description/item and amount columns. "
+               "Rows already in the ledger are skipped; missing categories are predicted from past entries.")
+    uploaded = st.file_uploader("CSV file", type=["csv"])
+    col1, col2 = st.columns(2)
+    dayfirst = col1.checkbox("Dates are day-first (31/01/2025)")
+    debits_negative = col2.checkbox("Spending shows as negative amounts")
+    if uploaded and st.button("📥 Import"):
+        sync = get_sheet_sync(ledger_name)
+        importer = Importer(ledger, debits_negative=debits_negative, dayfirst=dayfirst, numbers=sync.next_number)
+        with st.spinner("Importing..."):
+            stats = importer.run(uploaded, lambda rows: sync.add_pending(rows, journal=write_queue.submit))
+        st.success(f"✅ Imported {stats['imported']:,} of {stats['read']:,} rows "
+                   f"({stats['duplicates']:,} duplicates, {stats['skipped']:,} skipped) "
+                   f"at {stats['rows_per_second'] or 0:,} rows/s; they sync to the sheet in the background.")
+lap("Entry form")
 st.markdown("---")  # Divider line
-# --- FILTERED DATAFRAME FOR VISUALS ---
-df = df[df["ITEM CATEGORY"].str.lower().isin([c.lower() for c in category_budgets if c.lower() not in ["savings", "income"]])]
-df["DATE_dt"] = pd.to_datetime(df["DATE"], format="%m/%d/%Y", errors='coerce')
 # --- TODAY'S TRANSACTIONS TABLE ---
 st.markdown("### 📋 Today's Transactions")
 
-today_str = f"{datetime.now().month}/{datetime.now().day}/{datetime.now().year}"
-df_today = df[df["DATE"] == today_str]
-
+df_today = today_transactions(ledger, budgets)
 if not df_today.empty:
     st.dataframe(
-        df_today[["TIME", "ITEM", "ITEM CATEGORY", "No of ITEM", "Amount Spent"]],
+        df_today,
         use_container_width=True,
         hide_index=True
     )
 else:
     st.info("ℹ️ No transactions recorded yet today.")
+lap("Today's transactions")
 st.markdown("---")  # Divider line
-st.markdown("### 📅 Last Time Each Item Was Bought (by Category)")
-
-# Dropdown to filter by category
-all_categories = sorted(df["ITEM CATEGORY"].dropna().unique())
-selected_cat = st.selectbox("📂 Select Category", all_categories)
-
-if selected_cat:
-    df_cat = df[df["ITEM CATEGORY"] == selected_cat]
-    # Get last purchase date per item
-    last_purchase = df_cat.groupby("ITEM")["DATE_dt"].max().reset_index()
-    last_purchase["Last Bought"] = last_purchase["DATE_dt"].dt.strftime("%B %d")
-    last_purchase = last_purchase[["ITEM", "Last Bought"]].rename(columns={"ITEM": "Item"})
-
-    if not last_purchase.empty:
-        st.dataframe(last_purchase.sort_values("Last Bought", ascending=False), use_container_width=True)
-    else:
-        st.info("ℹ️ No purchases found in this category.")
+
+# The two sections below are fragments: changing their selectbox reruns only that section
+@st.fragment
+def last_bought_section():
+    with timed("Last bought"):
+        st.markdown("### 📅 Last Time Each Item Was Bought (by Category)")
+        ledger = load_ledger()
+
+        # Dropdown to filter by category
+        selected_cat = st.selectbox("📂 Select Category", purchase_categories(ledger, budgets))
+
+        if selected_cat:
+            last_purchase = last_purchases(ledger, selected_cat, budgets)
+            if not last_purchase.empty:
+                st.dataframe(last_purchase, use_container_width=True)
+            else:
+                st.info("ℹ️ No purchases found in this category.")
+
+@st.fragment
+def chart_section():
+    # --- DROPDOWN TO SELECT CHART VIEW ---
+    chart_view = st.selectbox("📊 Select Chart to Display", ["Weekly Spending", "Today's Breakdown", "Category Progress", "Monthly Trend"])
+
+    with timed("Charts"), profiler.span(f"chart.{chart_view}"):
+        ledger = load_ledger()
+        # --- WEEKLY BAR CHART ---
+        if chart_view == "Weekly Spending":
+            chart_data = weekly_chart_data(ledger, budgets)
+            if not chart_data.empty:
+                bar_chart = alt.Chart(chart_data).mark_bar().encode(
+                    x=alt.X("Day:N", sort=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]),
+                    y="Amount Spent:Q",
+                    tooltip=["Day", "Amount Spent"]
+                ).properties(title="Daily Spending", height=250)
+                st.altair_chart(bar_chart, use_container_width=True)
+            else:
+                st.info("ℹ️ No data for this week yet.")
+
+        # --- TODAY PIE CHART ---
+        elif chart_view == "Today's Breakdown":
+            pie_data = today_breakdown(ledger, budgets)
+            if not pie_data.empty:
+                pie_chart = alt.Chart(pie_data).mark_arc(innerRadius=50).encode(
+                    theta="Amount Spent:Q",
+                    color="ITEM:N",
+                    tooltip=["ITEM", "Amount Spent"]
+                ).properties(height=350)
+                st.altair_chart(pie_chart, use_container_width=True)
+            else:
+                st.info("ℹ️ No spending recorded today.")
+
+        # --- CATEGORY PROGRESS ---
+        elif chart_view == "Category Progress":
+            st.markdown("### 📂 Category Budget Tracking")
+            for r in budget_status(ledger, budgets).itertuples():
+                st.markdown(f"**{r.Category}** — ₦{r.Spent:,.0f} / ₦{r.Budget:,.0f} this {r.Period} ({r.Percent*100:.1f}%)"
+                            f" · projected ₦{r.Projected:,.0f}")
+                st.progress(min(r.Percent, 1.0))
+
+        # --- MONTHLY TREND ---
+        elif chart_view == "Monthly Trend":
+            trend_data = monthly_trend(ledger, budgets)
+            if not trend_data.empty:
+                trend_chart = alt.Chart(trend_data).mark_line(point=True).encode(
+                    x=alt.X("yearmonth(Month):T", title="Month"),
+                    y="sum(Amount Spent):Q",
+                    color="Category:N",
+                    tooltip=["Category", alt.Tooltip("yearmonth(Month):T", title="Month"), "Amount Spent"]
+                ).properties(title="Monthly Spending by Category", height=300)
+                st.altair_chart(trend_chart, use_container_width=True)
+            else:
+                st.info("ℹ️ No spending recorded yet.")
+
+last_bought_section()
 st.markdown("---")  # Divider line
-# --- DROPDOWN TO SELECT CHART VIEW ---
-chart_view = st.selectbox("📊 Select Chart to Display", ["Weekly Spending", "Today's Breakdown", "Category Progress"])
-
-# --- WEEKLY BAR CHART ---
-if chart_view == "Weekly Spending":
-    week_start = datetime.now() - timedelta(days=datetime.now().weekday())
-    df_week = df[df["DATE_dt"].between(week_start, datetime.now())]
-    if not df_week.empty:
-        chart_data = df_week.groupby("DATE_dt")["Amount Spent"].sum().reset_index()
-        chart_data["Day"] = chart_data["DATE_dt"].dt.strftime("%a")
-        bar_chart = alt.Chart(chart_data).mark_bar().encode(
-            x=alt.X("Day:N", sort=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]),
-            y="Amount Spent:Q",
-            tooltip=["Day", "Amount Spent"]
-        ).properties(title="Daily Spending", height=250)
-        st.altair_chart(bar_chart, use_container_width=True)
-    else:
-        st.info("ℹ️ No data for this week yet.")
-
-# --- TODAY PIE CHART ---
-elif chart_view == "Today's Breakdown":
-    today_str = f"{datetime.now().month}/{datetime.now().day}/{datetime.now().year}"
-    df_today = df[df["DATE"] == today_str]
-    pie_data = df_today.groupby("ITEM")["Amount Spent"].sum().reset_index()
-    if not pie_data.empty:
-        pie_chart = alt.Chart(pie_data).mark_arc(innerRadius=50).encode(
-            theta="Amount Spent:Q",
-            color="ITEM:N",
-            tooltip=["ITEM", "Amount Spent"]
-        ).properties(height=350)
-        st.altair_chart(pie_chart, use_container_width=True)
-    else:
-        st.info("ℹ️ No spending recorded today.")
-
-# --- CATEGORY PROGRESS ---
-elif chart_view == "Category Progress":
-    st.markdown("### 📂 Category Budget Tracking")
-    df_month = df[df["MONTH"] == datetime.now().strftime("%B %Y")]
-    cat_month = df_month.groupby("ITEM CATEGORY")["Amount Spent"].sum().reset_index()
-
-    for cat, budget in category_budgets.items():
-        if cat.lower() in ["savings", "income"]:
-            continue
-        spent = cat_month.loc[cat_month["ITEM CATEGORY"].str.lower() == cat.lower(), "Amount Spent"].sum()
-        percent = spent / budget if budget > 0 else 0
-        st.markdown(f"**{cat}** — ₦{spent:,.0f} / ₦{budget:,.0f} ({percent*100:.1f}%)")
-        st.progress(min(percent, 1.0))
+chart_section()
+
+# --- API USAGE ---
+st.sidebar.caption(f"Sheets API calls this rerun: {api_calls.count}")
+pending = write_queue.pending_count()
+if pending:
+    st.sidebar.caption(f"Transactions waiting to sync: {pending}")
+if write_queue.last_error:
+    st.sidebar.caption(f"Last sync error: {write_queue.last_error}")
+mirror = get_mirror(ledger_name)
+if mirror and mirror.last_error:
+    st.sidebar.caption(f"Last sheet mirror error: {mirror.last_error}")
+refresher = get_refresher(ledger_name)
+if refresher.refreshed_at:
+    st.sidebar.caption(f"Ledger refreshed {time.time() - refresher.refreshed_at:.0f}s ago")
+if refresher.last_error or get_sheet_sync(ledger_name).last_error:
+    st.sidebar.caption(f"Last refresh error: {refresher.last_error or get_sheet_sync(ledger_name).last_error}")
+startup = get_sheet_sync(ledger_name).timings
+if "warm_start" in startup:
+    st.sidebar.caption(f"Warm start from local cache: {startup['warm_start'] * 1000:.0f} ms")
+if "cold_start" in startup:
+    st.sidebar.caption(f"Cold start from sheet: {startup['cold_start'] * 1000:.0f} ms")
+
+# --- SECTION TIMINGS PANEL ---
+if show_timings:
+    st.sidebar.markdown("**Section timings (ms)**")
+    st.sidebar.dataframe(
+        pd.DataFrame({"Section": list(section_timings), "ms": [round(v, 1) for v in section_timings.values()]}),
+        hide_index=True,
+    )
+
+# --- PROFILING PANEL ---
+if profiler.enabled:
+    with st.sidebar.expander("📈 Profile", expanded=True):
+        summary = profiler.summary()
+        spans = pd.DataFrame.from_dict(summary["spans"], orient="index")
+        if not spans.empty:
+            st.dataframe(spans.drop(columns="histogram").sort_values("total_ms", ascending=False))
+        for name, rate in summary["hit_rates"].items():
+            if rate is not None:
+                st.caption(f"{name} hit rate: {rate * 100:.1f}%")
+        st.caption(f"Sheets API calls since reset: {summary['counters'].get('sheets.api_calls', 0)}")
+        st.download_button("⬇️ Export JSON", profiler.to_json(), file_name="profile.json", mime="application/json")
+        if st.button("Reset profile"):
+            profiler.reset()
@@ -0,0 +1,87 @@
+import threading
+import tomllib
+from ledger import CountingWorksheet
+
+# --- LEDGER CONFIG ---
+# Each household member / team gets a named ledger in secrets.toml:
+#
+#   [ledgers.tim]
+#   url = "https://docs.google.com/spreadsheets/d/..."
+#   worksheet = "My Spending Sheet"
+#   storage = "sqlite"        # optional: serve reads/writes from local SQLite, sheet as mirror
+#   sqlite_path = "tim.db"    # optional, defaults to .cache/<name>/ledger.sqlite3
+#   budgets_worksheet = "Budgets"   # optional tab with Category, Amount and Period columns
+#   refresh_interval = 60     # optional: seconds between background pulls of sheet changes
+#
+#   [ledgers.tim.budgets]     # optional, replaces the built-in budgets (amounts are monthly
+#   Food = 40000              # unless a period of "day" or "week" is given)
+#   Snacks = { amount = 15000, period = "week" }
+#
+# Without a [ledgers] table the app keeps using the original spreadsheet.
+SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+DEFAULT_LEDGERS = {
+    "default": {
+        "url": "https://docs.google.com/spreadsheets/d/1Pugi_cuQw25_GsGpVQAyzjWuuOFRLmP8yGKaIb6unD0/edit?gid=359073504#gid=359073504",
+        "worksheet": "My Spending Sheet",
+        "storage": "sheets",
+        "sqlite_path": None,
+        "budgets": None,
+        "budgets_worksheet": None,
+        "refresh_interval": 60,
+    },
+}
+
+def ledger_configs(secrets):
+    ledgers = secrets.get("ledgers")
+    if not ledgers:
+        return {name: dict(cfg) for name, cfg in DEFAULT_LEDGERS.items()}
+    return {
+        name: {
+            "url": cfg["url"],
+            "worksheet": cfg.get("worksheet", "My Spending Sheet"),
+            "storage": cfg.get("storage", "sheets"),
+            "sqlite_path": cfg.get("sqlite_path"),
+            "budgets": {k: dict(v) if hasattr(v, "keys") else v for k, v in cfg["budgets"].items()} if cfg.get("budgets") else None,
+            "budgets_worksheet": cfg.get("budgets_worksheet"),
+            "refresh_interval": cfg.get("refresh_interval", 60),
+        }
+        for name, cfg in ledgers.items()
+    }
+
+def load_secrets(path):
+    # Same secrets.toml Streamlit reads, for scripts that run without it
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+# --- CLIENT POOL ---
+class WorksheetPool:
+    # One authorized gspread client per process, with spreadsheet and worksheet handles opened
+    # once and reused, so sessions never re-authorize or repeat open_by_url metadata calls.
+    def __init__(self, creds_dict):
+        self.creds_dict = dict(creds_dict)
+        self._client = None
+        self.spreadsheets = {}
+        self.worksheets = {}
+        self.lock = threading.Lock()
+
+    def client(self):
+        with self.lock:
+            if self._client is None:
+                # Imported on first use, so scripts that only read config or local caches start fast
+                import gspread
+                from oauth2client.service_account import ServiceAccountCredentials
+                credentials = ServiceAccountCredentials.from_json_keyfile_dict(self.creds_dict, SCOPE)
+                self._client = gspread.authorize(credentials)
+            return self._client
+
+    def worksheet(self, url, name):
+        key = (url, name)
+        if key in self.worksheets:
+            return self.worksheets[key]
+        client = self.client()
+        with self.lock:
+            if key not in self.worksheets:
+                if url not in self.spreadsheets:
+                    self.spreadsheets[url] = client.open_by_url(url)
+                self.worksheets[key] = CountingWorksheet(self.spreadsheets[url].worksheet(name))
+            return self.worksheets[key]
@@ -0,0 +1,53 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from dashboard import budget_status
+from ledger import Ledger, date_str, week_str, month_str
+from benchmarks.synthetic import synthetic_rows
+
+# --- BUDGET ENGINE BENCHMARK ---
+# Time of budget_status on a synthetic ledger, after a change and served from the chart cache,
+# then a projection check: ledgers of several ages that spend the same amount every day must
+# project that month's spend exactly (spent so far plus the same amount for each day left).
+# Exits non-zero if any projection is off.
+#   python -m benchmarks.bench_budgets --rows 1000000
+def steady_ledger(days, per_day, now):
+    rows = []
+    for back in range(days):
+        day = now - timedelta(days=back)
+        rows.append([date_str(day), "1", "12:00", "bread", "Food", "1", f"{per_day:.2f}", week_str(day), month_str(day)])
+    return Ledger(rows[::-1])
+
+def check_projections(per_day=1000):
+    now = datetime(2025, 3, 20)
+    budgets = {"Food": {"amount": 20000, "period": "month"}}
+    expected = per_day * 31
+    failures = []
+    for days in (30, 35, 60, 120, 400):
+        row = budget_status(steady_ledger(days, per_day, now), budgets, now).iloc[0]
+        ok = abs(row["Projected"] - expected) < 0.01 and row["Status"] == "projected over"
+        print(f"{days:>5}-day ledger: projected {row['Projected']:>10,.2f} (expected {expected:,.2f})  {'ok' if ok else 'WRONG'}")
+        if not ok:
+            failures.append(days)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    ledger = Ledger(synthetic_rows(args.rows))
+    start = time.perf_counter()
+    budget_status(ledger)
+    changed = time.perf_counter() - start
+    start = time.perf_counter()
+    budget_status(ledger)
+    cached = time.perf_counter() - start
+    print(f"{args.rows:,} rows: budget_status {changed * 1000:.1f} ms after a change, {cached * 1000:.1f} ms cached")
+    # Spend is 1,000 a day from the first entry on; the month already has 20 days of spend
+    failures = check_projections()
+    if failures:
+        raise SystemExit(f"wrong projections for {failures}-day ledgers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from ledger import Ledger, date_str, week_str, month_str
+from benchmarks.synthetic import synthetic_rows
+
+# --- DATE FILTER BENCHMARK ---
+# Compares the old per-rerun string matching / reparsing against the parse-once sorted slices.
+#   python -m benchmarks.bench_filters --rows 1000000
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    start = time.perf_counter()
+    ledger = Ledger(rows)
+    print(f"{args.rows:,} rows, parsed once in {time.perf_counter() - start:.2f}s")
+
+    # The string-matching baseline ran on object columns, not the ledger's categoricals
+    df, now = ledger.df.astype({"DATE": object, "WEEK": object, "MONTH": object}), datetime.now()
+    week_start = now - timedelta(days=now.weekday())
+    cases = {
+        "today": (lambda: df[df["DATE"] == date_str(now)], lambda: ledger.on(now)),
+        "this week": (lambda: df[df["WEEK"] == week_str(now)], lambda: ledger.this_week(now)),
+        "this month": (lambda: df[df["MONTH"] == month_str(now)], lambda: ledger.this_month(now)),
+        "between": (
+            lambda: df[pd.to_datetime(df["DATE"], format="%m/%d/%Y", errors="coerce").between(week_start, now)],
+            lambda: ledger.between(week_start.date(), now),
+        ),
+    }
+    print(f"{'filter':<12}{'string match':>16}{'sorted slice':>16}{'speedup':>10}")
+    for name, (old, new) in cases.items():
+        old_t, new_t = best_of(old, args.repeat), best_of(new, args.repeat)
+        print(f"{name:<12}{old_t * 1000:>13.2f} ms{new_t * 1000:>13.3f} ms{old_t / new_t:>9.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import io
+import os
+import tempfile
+import time
+import pandas as pd
+from importer import Importer
+from ledger import CountingWorksheet, SheetSync, api_calls
+from writequeue import WriteQueue
+from benchmarks.fake_sheet import FakeWorksheet
+from benchmarks.synthetic import synthetic_rows, synthetic_sheet
+
+# --- BULK IMPORT BENCHMARK ---
+# Imports a bank-statement style CSV (no No/category columns, half of it already in the ledger)
+# into a synthetic ledger, then drains the write queue into a fake sheet with API latency.
+#   python -m benchmarks.bench_import --ledger-rows 100000 --rows 200000 --latency 0.3
+def statement(n, overlap):
+    # Last `overlap` rows of the ledger plus fresh rows from another seed, as a bank would export them
+    rows = overlap + synthetic_rows(n - len(overlap), seed=1)
+    df = pd.DataFrame(rows).iloc[:, [0, 2, 3, 6]]
+    df.columns = ["Transaction Date", "Time", "Description", "Debit"]
+    return df.to_csv(index=False)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ledger-rows", type=int, default=100_000)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per API call")
+    parser.add_argument("--min-interval", type=float, default=0.0, help="seconds between append calls")
+    args = parser.parse_args()
+
+    sheet = FakeWorksheet(synthetic_sheet(args.ledger_rows), latency=args.latency)
+    worksheet = CountingWorksheet(sheet)
+    sync = SheetSync(worksheet)
+    ledger = sync.get()
+    csv = statement(args.rows, [list(r) for r in sheet.values[-args.rows // 2:]])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WriteQueue(os.path.join(tmp, "import.sqlite3"), worksheet, on_flushed=sync.confirm_flushed,
+                           min_interval=args.min_interval)
+
+        importer = Importer(ledger, numbers=sync.next_number)
+        stats = importer.run(io.StringIO(csv), lambda rows: sync.add_pending(rows, journal=queue.submit))
+        print(", ".join(f"{k}: {v}" for k, v in stats.items()))
+
+        api_calls.reset()
+        start, total = time.perf_counter(), queue.pending_count()
+        while queue.flush():
+            pass
+        elapsed = time.perf_counter() - start
+    print(f"wrote {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s, {api_calls.count} append calls)")
+    print(f"sheet rows: {len(sheet.values) - 1:,}, ledger rows: {len(sync.ledger.df):,}, pending: {len(sync.pending)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import random
+import statistics
+import string
+import time
+import pandas as pd
+from item_index import ItemIndex
+from benchmarks.synthetic import CATEGORIES
+
+# --- ITEM INDEX MICROBENCHMARK ---
+#   python -m benchmarks.bench_item_index --items 50000
+def random_name(rng):
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(rng.randint(1, 3))]
+    return " ".join(words).title()
+
+def typo(rng, name):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+def timed(fn, queries):
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = list({random_name(rng) for _ in range(args.items * 2)})[:args.items]
+    rows = [(name, rng.choice(CATEGORIES)) for name in names for _ in range(rng.randint(1, 3))]
+    df = pd.DataFrame(rows, columns=["ITEM", "ITEM CATEGORY"]).astype("category")
+
+    start = time.perf_counter()
+    index = ItemIndex()
+    index.add(df)
+    print(f"{len(names):,} distinct items ({len(df):,} rows) indexed in {time.perf_counter() - start:.2f}s")
+
+    sample = rng.sample(names, args.queries)
+    cases = {
+        "exact predict": (index.predict, sample),
+        "prefix complete": (index.complete, [n[:rng.randint(1, 4)] for n in sample]),
+        "typo predict": (index.predict, [typo(rng, n) for n in sample]),
+    }
+    print(f"{'query':<18}{'median':>12}{'p99':>12}")
+    for name, (fn, queries) in cases.items():
+        median, p99 = timed(fn, queries)
+        print(f"{name:<18}{median:>9.1f} us{p99:>9.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import time
+import tracemalloc
+import pandas as pd
+from ledger import HEADERS, INDEXES, Ledger
+from benchmarks.synthetic import synthetic_rows
+
+# --- MEMORY REPORT ---
+# Bytes per row of the ledger as the original script held it (get_all_records dicts turned into
+# an object-dtype DataFrame) against the compact Ledger frame, column by column. The legacy frame
+# is built with object columns explicitly, as pandas < 3 did; pandas 3 would default to its
+# Arrow-backed str dtype.
+#   python -m benchmarks.bench_memory --rows 1000000 --heap
+def legacy_frame(rows):
+    records = [dict(zip(HEADERS, r)) for r in rows]
+    df = pd.DataFrame(records, dtype=object)
+    df["Amount Spent"] = pd.to_numeric(df["Amount Spent"], errors="coerce")
+    df["DATE_dt"] = pd.to_datetime(df["DATE"], format="%m/%d/%Y", errors="coerce")
+    return records, df
+
+def compact_ledger(rows):
+    # Indexes are built on first use; build them all, as the app's first rerun does
+    ledger = Ledger(rows)
+    for name in INDEXES:
+        getattr(ledger, name)
+    return ledger
+
+def retained(build, heap):
+    # Python heap still held by build()'s result, when heap tracking is on
+    if heap:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0] if heap else None
+    if heap:
+        tracemalloc.stop()
+    return result, elapsed, held
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--heap", action="store_true", help="also measure the retained Python heap (slower)")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    (records, legacy), legacy_t, legacy_heap = retained(lambda: legacy_frame(rows), args.heap)
+    ledger, compact_t, compact_heap = retained(lambda: compact_ledger(rows), args.heap)
+    before = legacy.memory_usage(index=False, deep=True) / len(legacy)
+    after = ledger.df.memory_usage(index=False, deep=True) / len(ledger.df)
+
+    print(f"{args.rows:,} rows")
+    print(f"{'column':<16}{'before B/row':>14}{'after B/row':>14}  after dtype")
+    for column in dict.fromkeys([*before.index, *after.index]):
+        old = f"{before[column]:.1f}" if column in before else "-"
+        new = f"{after[column]:.1f}" if column in after else "-"
+        dtype = ledger.df[column].dtype if column in after else ""
+        print(f"{column:<16}{old:>14}{new:>14}  {dtype}")
+    print(f"{'total':<16}{before.sum():>14.1f}{after.sum():>14.1f}  ({before.sum() / after.sum():.0f}x smaller)")
+    print(f"build time: {legacy_t:.2f}s before, {compact_t:.2f}s after")
+    if args.heap:
+        # The original cached the records list next to the frame, so it counts against "before"
+        print(f"retained heap: {legacy_heap / args.rows:.0f} B/row before (records + frame), "
+              f"{compact_heap / args.rows:.0f} B/row after")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from ledger import CountingWorksheet, SheetSync, date_str, week_str, month_str
+from writequeue import WriteQueue
+from benchmarks.fake_sheet import FakeWorksheet
+from benchmarks.synthetic import synthetic_sheet
+
+# --- CONCURRENT NUMBERING STRESS TEST ---
+# Many sessions submitting at once against a fake sheet with API latency, numbered either the
+# original way (count the day's rows in a full download, then append) or with the shared per-day
+# allocator plus the write-behind queue, while another thread keeps syncing the ledger. Checks
+# every day's "No" values are unique and gap-free; exits non-zero if the allocator ever repeats one.
+#   python -m benchmarks.bench_numbering --threads 16 --submits 50 --latency 0.05
+def new_row(day, number, i):
+    return [date_str(day), str(number), "12:00", f"stress item {i % 7}", "Food", "1", "100.00", week_str(day), month_str(day)]
+
+def legacy_submit(worksheet, day, i):
+    rows = worksheet.get_all_values()[1:]
+    number = sum(1 for r in rows if r[0] == date_str(day)) + 1
+    worksheet.append_row(new_row(day, number, i))
+
+def run_threads(n_threads, submits, submit):
+    latencies = []
+
+    def session(t):
+        rng = random.Random(t)
+        for i in range(submits):
+            start = time.perf_counter()
+            submit(rng, t * submits + i)
+            latencies.append(time.perf_counter() - start)
+    threads = [threading.Thread(target=session, args=(t,)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+def check(values, days):
+    # Duplicate and missing numbers per day, over the days the stress test wrote to
+    labels = {date_str(d) for d in days}
+    numbers = defaultdict(list)
+    for r in values[1:]:
+        if r[0] in labels:
+            numbers[r[0]].append(int(r[1]))
+    duplicates = sum(n - 1 for day in numbers.values() for n in Counter(day).values() if n > 1)
+    gaps = sum(max(day) - len(set(day)) for day in numbers.values())
+    return duplicates, gaps
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000, help="rows already in the sheet")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--submits", type=int, default=50, help="submits per thread")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per API call")
+    args = parser.parse_args()
+
+    now = datetime.now()
+    days = [now - timedelta(days=d) for d in range(3)]
+    pick = lambda rng: days[0] if rng.random() < 0.8 else rng.choice(days[1:])
+    print(f"{args.threads} sessions x {args.submits} submits, {args.rows:,} existing rows, {args.latency * 1000:.0f} ms per API call")
+    print(f"{'numbering':<12}{'submits/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'duplicates':>12}{'gaps':>6}")
+
+    results = {}
+    sheet = FakeWorksheet(synthetic_sheet(args.rows), latency=args.latency)
+    worksheet = CountingWorksheet(sheet)
+    elapsed, latencies = run_threads(args.threads, args.submits, lambda rng, i: legacy_submit(worksheet, pick(rng), i))
+    results["legacy"] = (elapsed, latencies, check(sheet.values, days))
+
+    sheet = FakeWorksheet(synthetic_sheet(args.rows), latency=args.latency)
+    worksheet = CountingWorksheet(sheet)
+    sync = SheetSync(worksheet)
+    sync.get()
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WriteQueue(os.path.join(tmp, "pending.sqlite3"), worksheet, on_flushed=sync.confirm_flushed, min_interval=0)
+        queue.start()
+        done = threading.Event()
+
+        def keep_syncing():
+            while not done.wait(0.2):
+                sync.refresh()
+        syncer = threading.Thread(target=keep_syncing)
+        syncer.start()
+
+        def submit(rng, i):
+            day = pick(rng)
+            sync.add_pending([new_row(day, sync.next_number(day), i)], journal=queue.submit)
+        elapsed, latencies = run_threads(args.threads, args.submits, submit)
+        done.set()
+        syncer.join()
+        while queue.pending_count():
+            time.sleep(0.05)
+    results["allocator"] = (elapsed, latencies, check(sheet.values, days))
+
+    for name, (elapsed, latencies, (duplicates, gaps)) in results.items():
+        total = len(latencies)
+        print(f"{name:<12}{total / elapsed:>11.0f}{latencies[total // 2] * 1000:>9.1f}"
+              f"{latencies[int(total * 0.95)] * 1000:>9.1f}{duplicates:>12}{gaps:>6}")
+    if results["allocator"][2] != (0, 0):
+        raise SystemExit("allocator produced duplicate or missing transaction numbers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import threading
+import time
+from datetime import datetime
+from dashboard import warm
+from ledger import Refresher, SheetSync, date_str, week_str, month_str
+from schema import NO_DAY
+from benchmarks.bench_rerun import page_data
+from benchmarks.fake_sheet import FakeWorksheet
+from benchmarks.synthetic import synthetic_sheet
+
+# --- BACKGROUND REFRESH BENCHMARK ---
+# Sessions rerendering the page while another device keeps appending to a fake sheet with API
+# latency. "blocking" is the previous SheetSync.get: the render that finds the ledger older than
+# max_age runs the sync itself. "background" leaves syncing (and building chart data for each new
+# snapshot) to a Refresher and serves the latest snapshot. Every render also checks its snapshot is whole (rollups agree with the frame).
+#   python -m benchmarks.bench_refresh --rows 200000 --latency 0.3 --seconds 10
+def external_row(i, now):
+    return [date_str(now), str(1000 + i), "12:00", f"other device item {i % 5}", "Food", "1", "250.00", week_str(now), month_str(now)]
+
+def whole(ledger):
+    dated = ledger.df["CENTS"].values[ledger.df["DAY"].values != NO_DAY]
+    return sum(ledger.rollups.by_day_category.values()) == int(dated.sum())
+
+def run(mode, args):
+    sheet = FakeWorksheet(synthetic_sheet(args.rows), latency=args.latency, per_row=args.per_row)
+    sync = SheetSync(sheet)
+    # One render before timing starts, so the lazily built indexes exist (steady state)
+    page_data(sync.get(), datetime.now())
+    if mode == "background":
+        sync.prepare = warm
+        Refresher(sync, interval=args.max_age)
+        render = lambda: sync.get(max_age=args.max_age * 10)
+    else:
+        def render():
+            with sync.refresh_lock:
+                if time.monotonic() - sync.synced_at > args.max_age:
+                    sync.refresh()
+            return sync.ledger
+    done = threading.Event()
+    latencies, torn = [], [0]
+
+    def writer():
+        i = 0
+        while not done.wait(args.write_every):
+            with sheet.lock:
+                sheet.values.append(external_row(i, datetime.now()))
+            i += 1
+
+    def session():
+        now = datetime.now()
+        while not done.is_set():
+            start = time.perf_counter()
+            ledger = render()
+            page_data(ledger, now)
+            latencies.append(time.perf_counter() - start)
+            torn[0] += not whole(ledger)
+            time.sleep(args.think)
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=session) for _ in range(args.sessions)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    done.set()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return latencies, torn[0], len(sheet.values) - 1 - len(sync.ledger.df)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per API call")
+    parser.add_argument("--per-row", type=float, default=0.0, help="simulated seconds per row transferred")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--max-age", type=float, default=1.0, help="seconds before the ledger counts as stale")
+    parser.add_argument("--write-every", type=float, default=0.2, help="seconds between rows from another device")
+    parser.add_argument("--think", type=float, default=0.05, help="seconds between a session's reruns")
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} rows, {args.sessions} sessions, {args.latency * 1000:.0f} ms per API call, "
+          f"refresh every {args.max_age:g}s, {args.seconds:g}s per mode")
+    print(f"{'mode':<12}{'renders':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'torn':>6}{'rows behind':>13}")
+    for mode in ("blocking", "background"):
+        latencies, torn, behind = run(mode, args)
+        n = len(latencies)
+        print(f"{mode:<12}{n:>9}{latencies[n // 2] * 1000:>9.1f}{latencies[int(n * 0.95)] * 1000:>9.1f}"
+              f"{latencies[-1] * 1000:>9.1f}{torn:>6}{behind:>13}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+import pandas as pd
+from dashboard import (budget_alerts, budget_status, budget_usage, last_purchases, monthly_trend,
+                       purchase_categories, today_breakdown, today_transactions, weekly_chart_data)
+from ledger import HEADERS, CountingWorksheet, SheetSync, api_calls, date_str, week_str, month_str
+from benchmarks.fake_sheet import FakeWorksheet
+from benchmarks.synthetic import synthetic_sheet
+
+# --- PER-RERUN BENCHMARK ---
+# Replays the data work of one page rerun against an in-memory worksheet with simulated API
+# latency, for synthetic ledgers of increasing size:
+#   legacy   - the original script: one get_all_records per metric plus a list-of-dicts DataFrame
+#   cold     - first rerun of a fresh process (full download into the ledger)
+#   warm     - rerun served from the shared ledger
+#   submit   - rerun right after a new row was appended (incremental sync)
+#   python -m benchmarks.bench_rerun --rows 10000 100000 1000000 --latency 0.3 --memory
+def page_data(ledger, now):
+    # Same calls, in the same order, as Spending_form.py makes on a full rerun
+    ledger.today_total(now), ledger.weekly_total(now), ledger.monthly_total(now)
+    budget_usage(ledger, now=now)
+    budget_alerts(budget_status(ledger, now=now))
+    ledger.likely_items(now)
+    ledger.items.predict("food item 1")
+    today_transactions(ledger, now=now)
+    categories = purchase_categories(ledger)
+    if categories:
+        last_purchases(ledger, categories[0])
+    weekly_chart_data(ledger, now=now)
+    today_breakdown(ledger, now=now)
+    budget_status(ledger, now=now)
+    monthly_trend(ledger)
+
+def legacy_rerun(worksheet, now):
+    records = lambda: worksheet.get_all_records(expected_headers=HEADERS)
+    item_category_map = {r["ITEM"].strip().lower(): r["ITEM CATEGORY"].strip() for r in records() if r["ITEM"]}
+    df = pd.DataFrame(records())
+    df["Amount Spent"] = pd.to_numeric(df["Amount Spent"], errors="coerce")
+    df["DATE_dt"] = pd.to_datetime(df["DATE"], format="%m/%d/%Y", errors="coerce")
+    df[df["DATE_dt"].dt.day_name() == now.strftime("%A")]["ITEM"].str.strip().value_counts().head(5)
+    for key, value in [("DATE", date_str(now)), ("WEEK", week_str(now)), ("MONTH", month_str(now)), ("MONTH", month_str(now))]:
+        sum(float(r["Amount Spent"] or 0) for r in records() if r[key] == value and r["ITEM CATEGORY"].lower() not in ["savings", "income"])
+    return item_category_map
+
+def measure(fn, memory):
+    api_calls.reset()
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if memory else None
+    if memory:
+        tracemalloc.stop()
+    return elapsed, api_calls.count, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per API call")
+    parser.add_argument("--per-row", type=float, default=2e-6, help="simulated seconds per row transferred")
+    parser.add_argument("--legacy-max", type=int, default=1_000_000, help="skip the legacy rerun above this size")
+    parser.add_argument("--memory", action="store_true", help="track peak Python memory (slower)")
+    args = parser.parse_args()
+
+    now = datetime.now()
+    print(f"{'rows':>10} {'scenario':<8}{'latency':>11}{'API calls':>11}{'peak MB':>10}")
+    for n in args.rows:
+        sheet = FakeWorksheet(synthetic_sheet(n), latency=args.latency, per_row=args.per_row)
+        worksheet = CountingWorksheet(sheet)
+        sync = SheetSync(worksheet)
+        scenarios = []
+        if n <= args.legacy_max:
+            scenarios.append(("legacy", lambda: legacy_rerun(worksheet, now)))
+        scenarios += [
+            ("cold", lambda: page_data(sync.get(), now)),
+            ("warm", lambda: page_data(sync.get(), now)),
+        ]
+
+        def submit():
+            worksheet.append_rows([[date_str(now), "1", "12:00", "Food item 1", "Food", "1", "1500", week_str(now), month_str(now)]])
+            page_data(sync.refresh(), now)
+        scenarios.append(("submit", submit))
+
+        for name, fn in scenarios:
+            elapsed, calls, peak = measure(fn, args.memory)
+            peak = f"{peak / 2 ** 20:.1f}" if peak is not None else "-"
+            print(f"{n:>10,} {name:<8}{elapsed * 1000:>8.0f} ms{calls:>11}{peak:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import re
+import threading
+import time
+from ledger import HEADERS
+
+# --- FAKE WORKSHEET ---
+# In-memory stand-in for a gspread Worksheet covering the calls the app makes. Every call sleeps
+# for `latency` seconds plus `per_row` seconds per row transferred, to mimic the Sheets API.
+RANGE = re.compile(r"^([A-Z]+)(\d*):([A-Z]+)(\d*)$")
+
+def column_index(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+class FakeWorksheet:
+    def __init__(self, values=None, latency=0.0, per_row=0.0, title="My Spending Sheet"):
+        self.values = [list(r) for r in values] if values else [list(HEADERS)]
+        self.latency = latency
+        self.per_row = per_row
+        self.title = title
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _wait(self, rows=0):
+        self.calls += 1
+        if self.latency or self.per_row:
+            time.sleep(self.latency + self.per_row * rows)
+
+    def _slice(self, a1):
+        match = RANGE.match(a1.split("!")[-1])
+        if not match:
+            raise ValueError(f"Unsupported range: {a1}")
+        c1, r1, c2, r2 = match.groups()
+        r1 = int(r1) if r1 else 1
+        r2 = int(r2) if r2 else len(self.values)
+        c1, c2 = column_index(c1), column_index(c2)
+        rows = [r[c1:c2 + 1] for r in self.values[r1 - 1:r2]]
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return rows
+
+    def get_all_values(self):
+        with self.lock:
+            rows = [list(r) for r in self.values]
+        self._wait(len(rows))
+        return rows
+
+    def get_all_records(self, expected_headers=None):
+        with self.lock:
+            header, rows = self.values[0], self.values[1:]
+            records = [dict(zip(header, r)) for r in rows]
+        self._wait(len(records))
+        return records
+
+    def get_values(self, a1=None):
+        with self.lock:
+            rows = self._slice(a1) if a1 else [list(r) for r in self.values]
+        self._wait(len(rows))
+        return rows
+
+    def batch_get(self, ranges):
+        with self.lock:
+            results = [self._slice(a1) for a1 in ranges]
+        self._wait(sum(len(r) for r in results))
+        return results
+
+    def col_values(self, col):
+        with self.lock:
+            values = [r[col - 1] if len(r) >= col else "" for r in self.values]
+        self._wait(len(values))
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def append_row(self, row, **kwargs):
+        return self.append_rows([row], **kwargs)
+
+    def append_rows(self, rows, **kwargs):
+        with self.lock:
+            first = len(self.values) + 1
+            self.values.extend([str(v) for v in r] for r in rows)
+            last = len(self.values)
+        self._wait(len(rows))
+        return {"updates": {"updatedRange": f"'{self.title}'!A{first}:I{last}", "updatedRows": len(rows)}}
+
+    def batch_clear(self, ranges):
+        with self.lock:
+            for a1 in ranges:
+                match = RANGE.match(a1.split("!")[-1])
+                start = int(match.group(2) or 1)
+                del self.values[start - 1:]
+        self._wait()
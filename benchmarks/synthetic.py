@@ -0,0 +1,31 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from budgets import category_budgets
+from ledger import HEADERS, week_str, month_str
+
+# --- SYNTHETIC LEDGERS ---
+CATEGORIES = list(category_budgets)
+
+def synthetic_rows(n, days=3 * 365, items_per_category=40, end=None, seed=0):
+    # n sheet rows (lists of strings, like get_all_values) spread over the last `days` days
+    rng = np.random.default_rng(seed)
+    end = end or datetime.now()
+    offsets = np.sort(rng.integers(0, days, n))[::-1]
+    dates = pd.to_datetime(end.date()) - pd.to_timedelta(offsets, unit="D")
+    categories = rng.integers(0, len(CATEGORIES), n)
+    items = rng.integers(0, items_per_category, n)
+    amounts = rng.gamma(2.0, 1500.0, n).round(2)
+    date_labels = {d: (f"{d.month}/{d.day}/{d.year}", week_str(d), month_str(d)) for d in dates.unique()}
+    rows, seq, last = [], 0, None
+    for d, c, i, a in zip(dates, categories, items, amounts):
+        seq = seq + 1 if d == last else 1
+        last = d
+        date, week, month = date_labels[d]
+        category = CATEGORIES[c]
+        rows.append([date, str(seq), f"{8 + (seq % 14)}:{seq % 60:02d}", f"{category} item {i}",
+                     category, "1", f"{a:.2f}", week, month])
+    return rows
+
+def synthetic_sheet(n, **kwargs):
+    return [HEADERS] + synthetic_rows(n, **kwargs)
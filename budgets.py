@@ -0,0 +1,103 @@
+from ledger import EXCLUDED_CATEGORIES
+
+# --- CATEGORY BUDGETS ---
+# Plain numbers are monthly budgets; a category can instead carry {"amount": ..., "period": ...}
+# with period "day", "week" or "month". Ledgers can override these in secrets.toml
+# ([ledgers.<name>.budgets]) or in a tab of their spreadsheet (see sheet_budgets).
+category_budgets = {
+    "Bet": 3000,
+    "Bill": 35000,
+    "Data": 11000,
+    "Food": 40000,
+    "Foodstuff": 150000,
+    "Money": 10000,
+    "Object": 50000,
+    "Snacks": 60000,
+    "transfer": 300000,
+    "income": 250000,
+    "Airtime": 1000,
+    "transport": 70000,
+    "Savings": 400000,
+}
+
+# How many of each period make up an average month
+PER_MONTH = {"day": 365.25 / 12, "week": 365.25 / 12 / 7, "month": 1}
+
+def budget_entries(budgets=category_budgets):
+    # {category: (period, amount)}
+    entries = {}
+    for category, value in budgets.items():
+        period, amount = (value.get("period", "month"), value["amount"]) if isinstance(value, dict) else ("month", value)
+        period = str(period).strip().lower()
+        if period not in PER_MONTH:
+            raise ValueError(f"Unknown budget period for {category}: {period}")
+        entries[category] = (period, float(amount))
+    return entries
+
+def spending_budgets(budgets=category_budgets):
+    # Monthly-equivalent budgets that count as spending (savings and income are tracked but not spent)
+    return {c: amount * PER_MONTH[period] for c, (period, amount) in budget_entries(budgets).items()
+            if c.lower() not in EXCLUDED_CATEGORIES}
+
+def checked_budgets(budgets, source):
+    # (budgets, problems): the entries budget_entries accepts, and a problem for each one dropped
+    kept, problems = {}, []
+    for category, value in budgets.items():
+        try:
+            budget_entries({category: value})
+        except KeyError:
+            problems.append(f"{source} budget for {category} skipped: no amount")
+            continue
+        except (ValueError, TypeError) as e:
+            problems.append(f"{source} budget for {category} skipped: {e}")
+            continue
+        kept[category] = value
+    return kept, problems
+
+def ledger_budgets(config, open_worksheet=None):
+    # (budgets, problems): a ledger's budgets tab if it has one (and open_worksheet(url, name) to
+    # read it), else its budgets table in secrets, else the defaults. problems lists entries that
+    # were skipped, or why the tab could not be used at all, for the caller to show.
+    configured, problems = checked_budgets(config["budgets"] or {}, "Configured")
+    if config["budgets"] and not configured:
+        problems.append("No usable budgets in secrets; using the defaults")
+    fallback = configured or dict(category_budgets)
+    if not (config["budgets_worksheet"] and open_worksheet):
+        return fallback, problems
+    tab = config["budgets_worksheet"]
+    try:
+        budgets, tab_problems = sheet_budgets(open_worksheet(config["url"], tab))
+    except Exception as e:
+        # Unreadable tab (API or auth errors included): the page still needs budgets to render
+        return fallback, problems + [f"Budget tab {tab!r} not used ({e}); using the configured budgets"]
+    if not budgets:
+        # An empty tab would leave the form without categories and hide every transaction
+        return fallback, problems + tab_problems + [f"Budget tab {tab!r} has no usable budgets; using the configured budgets"]
+    return budgets, tab_problems
+
+def sheet_budgets(worksheet):
+    # Budgets kept in a spreadsheet tab with Category and Amount columns, plus an optional Period.
+    # Returns (budgets, problems); rows with a bad amount or period are skipped and reported.
+    values = worksheet.get_all_values()
+    if not values:
+        return {}, []
+    header = [h.strip().lower() for h in values[0]]
+    if "category" not in header or "amount" not in header:
+        raise ValueError(f"Budget sheet needs Category and Amount columns, got {values[0]}")
+    column = {name: header.index(name) for name in ("category", "amount", "period") if name in header}
+    budgets, problems = {}, []
+    for number, row in enumerate(values[1:], start=2):
+        cell = lambda name: row[column[name]].strip() if name in column and column[name] < len(row) else ""
+        if not cell("category") or not cell("amount"):
+            continue
+        period = (cell("period") or "month").lower()
+        try:
+            amount = float(cell("amount").replace(",", "").replace("₦", ""))
+        except ValueError:
+            problems.append(f"Budget tab row {number} ({cell('category')}): amount {cell('amount')!r} is not a number")
+            continue
+        if period not in PER_MONTH:
+            problems.append(f"Budget tab row {number} ({cell('category')}): unknown period {cell('period')!r}")
+            continue
+        budgets[cell("category")] = {"amount": amount, "period": period}
+    return budgets, problems
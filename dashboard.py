@@ -0,0 +1,208 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from budgets import budget_entries, category_budgets, spending_budgets
+from instrument import profiler
+from schema import EPOCH, day_date, day_dates, day_number, weekdays
+
+# --- DASHBOARD DATA ---
+# Everything the page shows, computed from a Ledger without Streamlit, so the same code backs
+# the app, the benchmarks and any headless report.
+def visible(frame, budgets=category_budgets):
+    categories = [c.lower() for c in spending_budgets(budgets)]
+    shown = frame["ITEM CATEGORY"].cat.categories.str.lower().isin(categories)
+    return frame[shown[frame["ITEM CATEGORY"].cat.codes.values]]
+
+def budget_usage(ledger, budgets=category_budgets, now=None):
+    total_month = ledger.monthly_total(now)
+    total_budget = sum(spending_budgets(budgets).values())
+    return total_month, total_budget, total_month / total_budget if total_budget > 0 else 0
+
+def today_transactions(ledger, budgets=category_budgets, now=None):
+    df_today = visible(ledger.on(now or datetime.now()), budgets)
+    return df_today[["TIME", "ITEM", "ITEM CATEGORY", "No of ITEM"]].assign(**{"Amount Spent": df_today["CENTS"] / 100})
+
+# --- PRE-AGGREGATED CHART DATA ---
+# Chart and table data are small frames built once per ledger version and shared by every
+# session: switching chart views or categories is a dictionary lookup, and a new version (any
+# change to the ledger's rows) simply misses the cache. Data that only reads one day's rows is
+# keyed on that day's version instead, so it survives changes to every other day. Day and
+# month totals come straight from the ledger's rollups; only the per-item views group rows.
+class ChartCache:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, ledger, name, build, *args, version=None):
+        key = (ledger.version if version is None else version, name, args)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                profiler.hit("charts.cache", True)
+                return self.entries[key]
+        profiler.hit("charts.cache", False)
+        with profiler.span(f"charts.build.{name}"):
+            value = build()
+        with self.lock:
+            self.entries[key] = value
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+chart_cache = ChartCache()
+
+def _shown(budgets):
+    # Lower-cased visible category -> display name, hashable for the cache key
+    return tuple((c.lower(), c) for c in spending_budgets(budgets))
+
+def daily_totals(ledger, budgets=category_budgets):
+    # Visible spending per day, indexed by date
+    def build():
+        shown = dict(_shown(budgets))
+        totals = {}
+        for (day, category), cents in ledger.rollups.by_day_category.items():
+            if category in shown and cents:
+                totals[day] = totals.get(day, 0) + cents
+        return (pd.Series(totals, dtype="int64").sort_index() / 100).rename("Amount Spent")
+    return chart_cache.get(ledger, "daily_totals", build, _shown(budgets))
+
+def monthly_trend(ledger, budgets=category_budgets):
+    # Visible spending per month and category, for trends over years
+    def build():
+        shown = dict(_shown(budgets))
+        rows = [(pd.Timestamp(year, month, 1), shown[category], cents / 100)
+                for (year, month, category), cents in ledger.rollups.by_month_category.items()
+                if category in shown and cents]
+        return pd.DataFrame(rows, columns=["Month", "Category", "Amount Spent"]).sort_values(["Month", "Category"], ignore_index=True)
+    return chart_cache.get(ledger, "monthly_trend", build, _shown(budgets))
+
+def last_purchase_tables(ledger, budgets=category_budgets):
+    # Category -> items with their last purchase date, newest first, for every category at once
+    def build():
+        df = visible(ledger.df, budgets)
+        last = df.groupby(["ITEM CATEGORY", "ITEM"], observed=True)["DAY"].max().reset_index()
+        last = last.rename(columns={"ITEM": "Item"}).astype({"Item": str})
+        # Sorted by the date itself (newest first), not by its "%B %d" label
+        last = last.sort_values(["DAY", "Item"], ascending=[False, True])
+        last["Last Bought"] = pd.Series(day_dates(last["DAY"]), index=last.index).dt.strftime("%B %d")
+        return {category: group[["Item", "Last Bought"]].reset_index(drop=True)
+                for category, group in last.groupby("ITEM CATEGORY", observed=True)}
+    return chart_cache.get(ledger, "last_purchases", build, _shown(budgets))
+
+def purchase_categories(ledger, budgets=category_budgets):
+    return sorted(last_purchase_tables(ledger, budgets))
+
+def last_purchases(ledger, category, budgets=category_budgets):
+    empty = pd.DataFrame(columns=["Item", "Last Bought"])
+    return last_purchase_tables(ledger, budgets).get(category, empty)
+
+def weekly_chart_data(ledger, budgets=category_budgets, now=None):
+    today = (now or datetime.now()).date()
+    start = today - timedelta(days=today.weekday())
+    week = daily_totals(ledger, budgets).loc[start:today]
+    chart_data = pd.DataFrame({"DATE_dt": pd.to_datetime(list(week.index)), "Amount Spent": week.values})
+    chart_data["Day"] = chart_data["DATE_dt"].dt.strftime("%a")
+    return chart_data
+
+def today_breakdown(ledger, budgets=category_budgets, now=None):
+    # Per-item totals for today
+    day = day_number(now or datetime.now())
+    def build():
+        df_today = visible(ledger.on(now or datetime.now()), budgets)
+        return (df_today.groupby("ITEM", observed=True)["CENTS"].sum() / 100).rename("Amount Spent").reset_index()
+    return chart_cache.get(ledger, "today_breakdown", build, _shown(budgets), day, version=ledger.changed_on(day))
+
+def warm(ledger, budgets=category_budgets, now=None):
+    # Builds the shared chart data for a new ledger snapshot before any render asks for it
+    daily_totals(ledger, budgets)
+    monthly_trend(ledger, budgets)
+    last_purchase_tables(ledger, budgets)
+    today_breakdown(ledger, budgets, now)
+    daily_spend(ledger, budgets)
+
+# --- BUDGET ENGINE ---
+# Spent, remaining and projected spend for every budget in one vectorized pass: the rollups are
+# laid out once per ledger version as a days x categories matrix of cumulative spend, so any
+# period's spend for all categories is two row lookups. Projections are the run rate so far and
+# a weekday-seasonal one (spent so far plus the average spend of each remaining weekday over
+# the last `lookback` days).
+def daily_spend(ledger, budgets=category_budgets):
+    # (first day, cumulative cents matrix with a leading zero row, column per budgeted category)
+    def build():
+        columns = {c.lower(): i for i, c in enumerate(spending_budgets(budgets))}
+        cells = [((day - EPOCH).days, columns[category], cents)
+                 for (day, category), cents in ledger.rollups.by_day_category.items() if category in columns and cents]
+        if not cells:
+            return 0, np.zeros((1, len(columns)))
+        days, cols, cents = (np.array(v) for v in zip(*cells))
+        first = days.min()
+        matrix = np.zeros((days.max() - first + 1, len(columns)))
+        np.add.at(matrix, (days - first, cols), cents / 100)
+        return first, np.vstack([np.zeros((1, len(columns))), matrix.cumsum(axis=0)])
+    return chart_cache.get(ledger, "daily_spend", build, _shown(budgets))
+
+def period_bounds(period, day):
+    # First and last DAY of the day/week/month containing day
+    if period == "day":
+        return day, day
+    if period == "week":
+        start = day - int(weekdays(day))
+        return start, start + 6
+    d = day_date(day)
+    end = (d.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return day - (d.day - 1), day + (end - d).days
+
+def budget_status(ledger, budgets=category_budgets, now=None, lookback=182, warn_at=0.8):
+    today = day_number(now or datetime.now())
+    entries = {c: e for c, e in budget_entries(budgets).items() if c in spending_budgets(budgets)}
+    names, periods = list(entries), [p for p, _ in entries.values()]
+    amounts = np.array([a for _, a in entries.values()])
+    first, cumulative = daily_spend(ledger, budgets)
+    row = lambda days: np.clip(np.asarray(days) - first + 1, 0, len(cumulative) - 1)
+    bounds = {p: period_bounds(p, today) for p in set(periods)}
+    starts = np.array([bounds[p][0] for p in periods], dtype=int)
+    ends = np.array([bounds[p][1] for p in periods], dtype=int)
+    cols = np.arange(len(names))
+    spent = cumulative[row(today), cols] - cumulative[row(starts - 1), cols]
+    elapsed, length = today - starts + 1, ends - starts + 1
+    run_rate = spent / elapsed * length
+
+    # Average spend per weekday and category over the lookback window, today excluded. The window
+    # starts no earlier than the first entry, or days before the ledger existed would count as
+    # zero-spend days and drag the averages of young ledgers down
+    window = np.arange(max(today - lookback, first), today)
+    daily = cumulative[row(window)] - cumulative[row(window - 1)]
+    days_seen = np.bincount(weekdays(window), minlength=7)
+    by_weekday = np.stack([daily[weekdays(window) == w].sum(axis=0) for w in range(7)]) / np.maximum(days_seen, 1)[:, None]
+    remaining_days = {p: np.bincount(weekdays(np.arange(today + 1, end + 1)), minlength=7) for p, (_, end) in bounds.items()}
+    ahead = np.stack([remaining_days[p] for p in periods]) if names else np.zeros((0, 7))
+    seasonal = spent + (ahead * by_weekday.T).sum(axis=1)
+    enough_history = today - first >= 28
+    projected = seasonal if enough_history else run_rate
+
+    status = np.select([spent > amounts, projected > amounts, spent >= warn_at * amounts], ["over", "projected over", "warning"], "ok")
+    return pd.DataFrame({
+        "Category": names,
+        "Period": periods,
+        "Budget": amounts,
+        "Spent": spent,
+        "Remaining": amounts - spent,
+        "Percent": np.divide(spent, amounts, out=np.zeros_like(spent), where=amounts > 0),
+        "Run rate": run_rate,
+        "Projected": projected,
+        "Status": status,
+    })
+
+def budget_alerts(status):
+    alerts = []
+    for r in status[status["Status"] != "ok"].itertuples():
+        if r.Status == "over":
+            alerts.append(f"{r.Category}: ₦{r.Spent:,.0f} spent this {r.Period}, over its ₦{r.Budget:,.0f} budget")
+        elif r.Status == "projected over":
+            alerts.append(f"{r.Category}: on track for ₦{r.Projected:,.0f} this {r.Period}, over its ₦{r.Budget:,.0f} budget")
+        else:
+            alerts.append(f"{r.Category}: {r.Percent * 100:.0f}% of this {r.Period}'s ₦{r.Budget:,.0f} budget used")
+    return alerts
@@ -0,0 +1,161 @@
+import argparse
+import os
+import time
+from collections import Counter
+import pandas as pd
+from ledger import date_str, week_str, month_str
+from schema import EPOCH, day_date, day_number, labels, to_cents
+from sequences import SequenceAllocator
+from storage import sheet_number
+
+# --- BULK IMPORT ---
+# Streams a CSV (a ledger export or a bank statement) in chunks and turns it into sheet rows:
+# columns are matched by name, categories come from the statement or the ledger's item index,
+# per-day transaction numbers come from numbers(date) (a SheetSync's shared allocator, or one of
+# the importer's own continuing from the ledger's highest numbers), and rows already in
+# the ledger are skipped. Rows go to write(rows) one chunk at a time, so the app can patch them
+# into the shared ledger and hand them to the write-behind queue like any submitted row.
+COLUMN_ALIASES = {
+    "date": ["date", "transaction date", "trans date", "posted date", "posting date", "value date", "booking date"],
+    "time": ["time", "transaction time"],
+    "item": ["item", "description", "narration", "details", "memo", "payee", "merchant", "remarks"],
+    "category": ["item category", "category"],
+    "qty": ["no of item", "qty", "quantity"],
+    "amount": ["amount spent", "amount", "debit", "debit amount", "withdrawal", "withdrawals", "money out", "paid out"],
+}
+
+def match_columns(header):
+    lowered = {str(h).strip().lower(): h for h in header}
+    columns = {field: next((lowered[a] for a in aliases if a in lowered), None) for field, aliases in COLUMN_ALIASES.items()}
+    missing = [f for f in ("date", "item", "amount") if columns[f] is None]
+    if missing:
+        raise ValueError(f"No column for {', '.join(missing)} in {list(header)}")
+    return columns
+
+def existing_keys(ledger):
+    # Multiset of (day, item, cents) already in the ledger: the dedup index
+    df = ledger.df
+    keys = pd.Series(0, index=df.index).groupby([df["DAY"].values, labels(df["ITEM"], lower=True), df["CENTS"].values]).size()
+    return Counter({(int(d), i, int(c)): int(n) for (d, i, c), n in keys.items()})
+
+class Importer:
+    def __init__(self, ledger, default_category="", debits_negative=False, date_format=None, dayfirst=False, numbers=None):
+        self.ledger = ledger
+        if numbers is None:
+            allocator = SequenceAllocator()
+            numbers = lambda date: allocator.next(ledger, day_number(date))
+        self.numbers = numbers
+        self.default_category = default_category
+        self.debits_negative = debits_negative
+        self.date_format = date_format
+        self.dayfirst = dayfirst
+        self.known = existing_keys(ledger)
+        self.seen = Counter()
+        self.dates = {}
+        self.predicted = {}
+        self.stats = Counter(dict.fromkeys(["read", "imported", "duplicates", "skipped", "categorized", "uncategorized"], 0))
+
+    def _category(self, item):
+        if item not in self.predicted:
+            self.predicted[item] = self.ledger.items.predict(item) or self.default_category
+        return self.predicted[item]
+
+    def _date_labels(self, day):
+        # DATE, WEEK and MONTH cells, formatted once per day
+        if day not in self.dates:
+            date = day_date(day)
+            self.dates[day] = (date_str(date), week_str(date), month_str(date))
+        return self.dates[day]
+
+    def rows(self, chunk, columns):
+        # Sheet rows for one chunk of the CSV
+        self.stats["read"] += len(chunk)
+        # Plain lists: iterating pandas string and datetime columns row by row is far slower
+        field = lambda name: chunk[columns[name]].str.strip().tolist() if columns[name] else [""] * len(chunk)
+        dates = pd.to_datetime(chunk[columns["date"]], format=self.date_format, dayfirst=self.dayfirst, errors="coerce")
+        valid = dates.notna().tolist()
+        days = (dates.dt.normalize() - pd.Timestamp(EPOCH)).dt.days.fillna(0).astype("int64").tolist()
+        cents = to_cents(chunk[columns["amount"]])
+        cents = (-cents if self.debits_negative else cents).tolist()
+        rows = []
+        for ok, day, item, category, cent, at, qty in zip(valid, days, field("item"), field("category"), cents, field("time"), field("qty")):
+            if not ok or not item or cent <= 0:
+                self.stats["skipped"] += 1
+                continue
+            key = (day, item.lower(), cent)
+            self.seen[key] += 1
+            if self.seen[key] <= self.known[key]:
+                self.stats["duplicates"] += 1
+                continue
+            if not category:
+                category = self._category(item)
+                self.stats["categorized" if category else "uncategorized"] += 1
+            date_cell, week, month = self._date_labels(day)
+            # Numbers as the form writes them, so imported rows add up in the sheet like typed ones
+            rows.append([date_cell, int(self.numbers(day_date(day))), at, item, category, sheet_number(qty or 1), cent / 100, week, month])
+        self.stats["imported"] += len(rows)
+        return rows
+
+    def run(self, source, write, chunk_size=5000):
+        # Streams source through write(rows); returns counts plus throughput in rows/second
+        start = time.perf_counter()
+        chunks = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_size, skipinitialspace=True)
+        columns = None
+        for chunk in chunks:
+            columns = columns or match_columns(chunk.columns)
+            rows = self.rows(chunk, columns)
+            if rows:
+                write(rows)
+        elapsed = time.perf_counter() - start
+        return {**self.stats, "seconds": round(elapsed, 3), "rows_per_second": round(self.stats["read"] / elapsed) if elapsed else None}
+
+def main():
+    from backend import WorksheetPool, ledger_configs, load_secrets
+    from ledger import SheetSync
+    from storage import SQLiteStorage
+    from writequeue import WriteQueue, is_retryable
+
+    parser = argparse.ArgumentParser(description="Import a CSV or bank statement into a ledger")
+    parser.add_argument("csv_path")
+    parser.add_argument("--ledger", default="default")
+    parser.add_argument("--secrets", default=os.path.join(".streamlit", "secrets.toml"))
+    parser.add_argument("--default-category", default="", help="category for rows nothing could be matched to")
+    parser.add_argument("--debits-negative", action="store_true", help="spending shows as negative amounts")
+    parser.add_argument("--date-format", help="e.g. %%d/%%m/%%Y; inferred when omitted")
+    parser.add_argument("--dayfirst", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be imported without writing")
+    args = parser.parse_args()
+
+    secrets = load_secrets(args.secrets)
+    config = ledger_configs(secrets)[args.ledger]
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", args.ledger)
+    if config["storage"] == "sqlite":
+        target = SQLiteStorage(config["sqlite_path"] or os.path.join(cache_dir, "ledger.sqlite3"))
+    else:
+        target = WorksheetPool(secrets["gcp_service_account"]).worksheet(config["url"], config["worksheet"])
+    sync = SheetSync(target)
+    # A journal of its own, so a running app never flushes the same rows; rows left over from an
+    # interrupted import are written first and count as existing for the dedup
+    queue = WriteQueue(os.path.join(cache_dir, "import.sqlite3"), target, on_flushed=sync.confirm_flushed)
+    sync.get()
+    sync.add_pending([row for _, row in queue.pending_rows()])
+    importer = Importer(sync.ledger, args.default_category, args.debits_negative, args.date_format, args.dayfirst,
+                        numbers=sync.next_number)
+    stats = importer.run(args.csv_path, lambda rows: sync.add_pending(rows, journal=None if args.dry_run else queue.submit),
+                         args.chunk_size)
+    print(", ".join(f"{k}: {v}" for k, v in stats.items()))
+    if args.dry_run:
+        return
+    start, total = time.perf_counter(), queue.pending_count()
+    queue.start()
+    while (left := queue.pending_count()) > 0:
+        if queue.last_error and not is_retryable(queue.last_error):
+            raise SystemExit(f"\nImport stopped: {queue.last_error} ({left} rows still journaled)")
+        print(f"\rwriting: {total - left}/{total} rows{f' (last error: {queue.last_error})' if queue.last_error else ''}", end="")
+        time.sleep(1)
+    elapsed = time.perf_counter() - start
+    print(f"\rwrote {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+# --- PROFILER ---
+# Opt-in, process-wide timers and counters for the hot paths (sheet syncs, frame building, date
+# parsing, rollups, recommendations, chart building). Spans keep a latency histogram plus the
+# most recent samples for percentiles; counters track API calls and cache hits/misses
+# ("<name>.hit" / "<name>.miss" pairs are reported as hit rates). Off unless SPENDING_PROFILE=1
+# or something sets profiler.enabled, and a disabled span costs one attribute check.
+BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000]
+
+class Profiler:
+    def __init__(self, enabled=False, samples=1000):
+        self.enabled = enabled
+        self.samples = samples
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self._clear()
+
+    def _clear(self):
+        self.histograms = defaultdict(lambda: [0] * (len(BUCKETS_MS) + 1))
+        self.recent = defaultdict(lambda: deque(maxlen=self.samples))
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.started = time.time()
+
+    def record(self, name, ms):
+        with self.lock:
+            self.histograms[name][bisect_left(BUCKETS_MS, ms)] += 1
+            self.recent[name].append(ms)
+            self.totals[name] += ms
+            self.calls[name] += 1
+
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name):
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += n
+
+    def hit(self, name, hit):
+        self.count(f"{name}.{'hit' if hit else 'miss'}")
+
+    def summary(self):
+        with self.lock:
+            spans = {}
+            for name, calls in self.calls.items():
+                recent = sorted(self.recent[name])
+                spans[name] = {
+                    "calls": calls,
+                    "total_ms": round(self.totals[name], 3),
+                    "mean_ms": round(self.totals[name] / calls, 3),
+                    "p50_ms": round(recent[len(recent) // 2], 3),
+                    "p95_ms": round(recent[min(int(len(recent) * 0.95), len(recent) - 1)], 3),
+                    "max_ms": round(recent[-1], 3),
+                    "histogram": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], self.histograms[name])),
+                }
+            counters = dict(self.counters)
+        hit_rates = {}
+        for name in {k.rsplit(".", 1)[0] for k in counters if k.endswith((".hit", ".miss"))}:
+            hits, misses = counters.get(f"{name}.hit", 0), counters.get(f"{name}.miss", 0)
+            hit_rates[name] = round(hits / (hits + misses), 4) if hits + misses else None
+        return {"since": self.started, "spans": spans, "counters": counters, "hit_rates": hit_rates}
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2, sort_keys=True)
+
+profiler = Profiler(enabled=os.environ.get("SPENDING_PROFILE") == "1")
@@ -0,0 +1,96 @@
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+import pandas as pd
+from schema import labels
+
+# --- ITEM INDEX ---
+# Item -> category predictor for the entry form. Every item keeps a vote per category (majority
+# wins instead of whatever was entered last), item names sit in a sorted list for prefix
+# completion, and a trigram index narrows fuzzy matches down to a handful of candidates before
+# any edit-distance scoring. Ledger feeds appended or withdrawn frames through add().
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class ItemIndex:
+    def __init__(self, fuzzy_cutoff=0.75, fuzzy_candidates=10):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.fuzzy_candidates = fuzzy_candidates
+        self.votes = defaultdict(Counter)
+        self.names = {}
+        self.keys = []
+        self.grams = defaultdict(set)
+
+    def add(self, df, sign=1):
+        items, keys, categories = labels(df["ITEM"]), labels(df["ITEM"], lower=True), labels(df["ITEM CATEGORY"])
+        keep = (keys != "") & (categories != "")
+        if not keep.any():
+            return
+        items, keys, categories = items[keep], keys[keep], categories[keep]
+        grouped = pd.Series(keys).groupby([keys, categories]).size()
+        self.names.update(zip(keys, items))
+        for (key, category), count in grouped.items():
+            if key not in self.votes:
+                insort(self.keys, key)
+                for gram in trigrams(key):
+                    self.grams[gram].add(key)
+            self.votes[key][category] += sign * int(count)
+
+    def copy(self):
+        other = ItemIndex(self.fuzzy_cutoff, self.fuzzy_candidates)
+        other.votes = defaultdict(Counter, {k: c.copy() for k, c in self.votes.items()})
+        other.names, other.keys = dict(self.names), list(self.keys)
+        other.grams = defaultdict(set, {g: keys.copy() for g, keys in self.grams.items()})
+        return other
+
+    def category(self, key):
+        votes = self.votes.get(key)
+        if not votes:
+            return None
+        category, count = votes.most_common(1)[0]
+        return category if count > 0 else None
+
+    def complete(self, prefix, n=8, scan=200):
+        # Up to n known items starting with prefix, most frequently bought first
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        start = bisect_left(self.keys, prefix)
+        matches = []
+        for key in self.keys[start:start + scan]:
+            if not key.startswith(prefix):
+                break
+            matches.append(key)
+        matches.sort(key=lambda k: -sum(self.votes[k].values()))
+        return [self.names[k] for k in matches[:n]]
+
+    def closest(self, key):
+        # Fuzzy match: rank items sharing the most trigrams, then score only those. Grams shared
+        # by a large slice of the catalogue (like the leading "  s") say little and cost the most.
+        common = max(200, len(self.keys) // 100)
+        postings = sorted((self.grams.get(gram, ()) for gram in trigrams(key)), key=len)
+        hits = Counter()
+        for i, keys in enumerate(postings):
+            if len(keys) > common and i >= 2:
+                break
+            hits.update(keys)
+        matcher = SequenceMatcher(None, "", key)
+        best, best_ratio = None, self.fuzzy_cutoff
+        for candidate, _ in hits.most_common(self.fuzzy_candidates):
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() > best_ratio and matcher.quick_ratio() > best_ratio:
+                ratio = matcher.ratio()
+                if ratio > best_ratio:
+                    best, best_ratio = candidate, ratio
+        return best
+
+    def predict(self, text):
+        # Category for an exact, then prefix, then fuzzy match of text; None if nothing is close
+        key = text.strip().lower()
+        if not key:
+            return None
+        if key not in self.votes:
+            completions = self.complete(key, n=1)
+            key = completions[0].lower() if completions else self.closest(key)
+        return self.category(key) if key else None
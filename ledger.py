@@ -0,0 +1,541 @@
+import copy
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+from instrument import profiler
+from item_index import ItemIndex
+from recommend import ItemFrequencies
+from rollups import Rollups
+from schema import HEADERS, TEXT_COLUMNS, day_number, parse_days, to_cents
+from sequences import DaySequences, SequenceAllocator
+
+# --- SCHEMA ---
+# Ledger versions are unique across instances, so a replacement ledger (full resync, cache
+# load) never reuses the version of the one it replaced
+VERSIONS = itertools.count(1)
+EXCLUDED_CATEGORIES = ["savings", "income"]
+
+def date_str(d):
+    return f"{d.month}/{d.day}/{d.year}"
+
+def week_str(d):
+    return f"{(d - timedelta(days=d.weekday())).day}-{d.strftime('%b')}"
+
+def month_str(d):
+    return d.strftime("%B %Y")
+
+# --- SHEETS API CALL COUNTER ---
+# Streamlit runs each session's script (and any cached function it triggers) in that
+# session's own thread, so a thread-local count is a per-rerun count.
+class ApiCallCounter(threading.local):
+    count = 0
+
+    def reset(self):
+        self.count = 0
+
+    def add(self, n=1):
+        self.count += n
+
+api_calls = ApiCallCounter()
+
+class CountingWorksheet:
+    # Proxy around a gspread Worksheet that counts every method call as one API call
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            api_calls.add()
+            profiler.count("sheets.api_calls")
+            with profiler.span(f"sheets.{name}"):
+                return attr(*args, **kwargs)
+        return call
+
+# --- SNAPSHOT ---
+def fetch_rows(worksheet):
+    values = worksheet.get_all_values()
+    if not values:
+        return []
+    header, rows = values[0], values[1:]
+    if header[:len(HEADERS)] != HEADERS:
+        raise ValueError(f"Unexpected sheet headers: {header}")
+    return rows
+
+def row_signature(date, no, item, category, cents):
+    return "|".join([str(date).strip(), str(no).strip(), str(item).strip(), str(category).strip(), str(int(cents))])
+
+def raw_signature(row):
+    row = (list(row) + [""] * len(HEADERS))[:len(HEADERS)]
+    return row_signature(row[0], row[1], row[3], row[4], to_cents(pd.Series([row[6]]))[0])
+
+def concat_frames(a, b):
+    # Appends ledger frames column by column, merging the categories of the text columns
+    # (pd.concat would fall back to object columns whenever the categories differ)
+    return pd.DataFrame({
+        c: union_categoricals([a[c], b[c]]) if c in TEXT_COLUMNS else np.concatenate([a[c].values, b[c].values])
+        for c in a.columns
+    })
+
+# Incrementally maintained views over the rows: attribute -> (factory, profiler span)
+INDEXES = {
+    "rollups": (lambda: Rollups(EXCLUDED_CATEGORIES), "rollups.add"),
+    "frequencies": (ItemFrequencies, "recommend.add"),
+    "items": (ItemIndex, "item_index.add"),
+    "sequences": (DaySequences, "sequences.add"),
+}
+# Sessions that all need an index at once wait for one build instead of each making their own
+INDEX_BUILD_LOCK = threading.Lock()
+
+class Ledger:
+    # Typed in-memory table built from one sheet download; every metric reads from it.
+    # See schema.py for the compact column layout: DATE is parsed once into DAY and the frame is
+    # kept sorted by DAY, so date filters are binary-searched slices.
+    # ROW keeps the sheet row number of each record so syncs can be checked against the sheet;
+    # rows submitted locally but not yet written to the sheet get negative ROWs (-1, -2, ...).
+    # version changes whenever the rows' contents do, for caches of data derived from them, and
+    # day_versions records which version last touched each DAY so per-day data can outlive
+    # changes elsewhere. Renumbering pending rows leaves both alone.
+    # SheetSync updates a copy() and swaps it in whole, so a reader never sees a half-applied
+    # change; nothing modifies df in place, so copies share it and only the indexes are copied.
+    # Indexes are built from the whole frame the first time they are used, so scripts that only
+    # need some of them (report.py) never pay for the rest.
+    def __init__(self, rows, first_row=2):
+        self.pending_seq = 0
+        self.set_frame(self._frame(rows, self._row_numbers(len(rows), first_row)))
+
+    def set_frame(self, df):
+        self.df = df.sort_values("DAY", kind="stable", ignore_index=True)
+        for name in INDEXES:
+            self.__dict__.pop(name, None)
+        self.day_versions = {}
+        self.version = self.built = next(VERSIONS)
+
+    def __getattr__(self, name):
+        if name not in INDEXES:
+            raise AttributeError(name)
+        with INDEX_BUILD_LOCK:
+            if name not in self.__dict__:
+                make, span = INDEXES[name]
+                index = make()
+                with profiler.span(span):
+                    index.add(self.df)
+                self.__dict__[name] = index
+            return self.__dict__[name]
+
+    def copy(self):
+        other = copy.copy(self)
+        for name in INDEXES:
+            if name in self.__dict__:
+                setattr(other, name, self.__dict__[name].copy())
+        other.day_versions = dict(self.day_versions)
+        return other
+
+    def changed_on(self, day):
+        # Version of the last change to the rows dated day (a DAY ordinal)
+        return self.day_versions.get(day, self.built)
+
+    def _touch(self, days):
+        self.version = next(VERSIONS)
+        self.day_versions.update(dict.fromkeys(np.unique(days).tolist(), self.version))
+
+    def _index(self, df, sign=1):
+        # Built indexes take appended or withdrawn frames; the rest see them when they are built
+        for name, (make, span) in INDEXES.items():
+            if name in self.__dict__:
+                with profiler.span(span):
+                    self.__dict__[name].add(df, sign)
+
+    def _row_numbers(self, n, first_row):
+        if first_row is not None:
+            return range(first_row, first_row + n)
+        self.pending_seq += n
+        return range(-(self.pending_seq - n + 1), -(self.pending_seq + 1), -1)
+
+    @staticmethod
+    @profiler.timed("ledger.build_frame")
+    def _frame(rows, row_numbers):
+        # Every column is factorized into a categorical, so blank-row checks, amount and date
+        # parsing run once per distinct value instead of once per cell
+        width = len(HEADERS)
+        grid = np.empty((len(rows), width), dtype=object)
+        if rows:
+            grid[:] = [r if len(r) == width else (list(r) + [""] * width)[:width] for r in rows]
+        columns, blank = {}, np.ones(len(rows), dtype=bool)
+        for i, header in enumerate(HEADERS):
+            values = grid[:, i]
+            if pd.api.types.infer_dtype(values, skipna=False) not in ("string", "empty"):
+                values = values.astype(str).astype(object)
+            column = pd.Categorical.from_codes(*pd.factorize(values))
+            blank &= (column.categories.str.strip() == "")[column.codes]
+            columns[header] = column
+        keep = ~blank
+        columns = {h: pd.Categorical.from_codes(c.codes[keep], c.categories) for h, c in columns.items()}
+        with profiler.span("ledger.parse_dates"):
+            dates = columns["DATE"]
+            days = parse_days(pd.Series(dates.categories, dtype=object))[dates.codes]
+        amounts = columns.pop("Amount Spent")
+        df = pd.DataFrame({
+            **columns,
+            "CENTS": to_cents(pd.Series(amounts.categories, dtype=object)).values[amounts.codes],
+            "DAY": days,
+            "ROW": np.asarray(row_numbers, dtype="int32")[keep],
+        })
+        return df.sort_values("DAY", kind="stable", ignore_index=True)
+
+    def extend(self, rows, first_row=None):
+        new = self._frame(rows, self._row_numbers(len(rows), first_row))
+        if new.empty:
+            return
+        df = concat_frames(self.df, new)
+        # New rows are normally the latest, so the frame only needs re-sorting for backdated ones
+        if not self.df.empty and new["DAY"].iloc[0] < self.df["DAY"].iloc[-1]:
+            df = df.sort_values("DAY", kind="stable", ignore_index=True)
+        self.df = df
+        self._index(new)
+        self._touch(new["DAY"].values)
+
+    def drop_pending(self, n):
+        pending = self.df.loc[self.df["ROW"] < 0, "ROW"].sort_values(ascending=False).index[:n]
+        if len(pending):
+            self._index(self.df.loc[pending], sign=-1)
+            self._touch(self.df.loc[pending, "DAY"].values)
+            self.df = self.df.drop(pending).reset_index(drop=True)
+
+    def adopt_pending(self, n, first_row):
+        # The n earliest pending rows reached the sheet as rows first_row, first_row + 1, ...:
+        # renumber them in place instead of withdrawing and re-adding them to every index
+        rows = self.df["ROW"].values.copy()
+        pending = np.flatnonzero(rows < 0)
+        adopted = pending[np.argsort(-rows[pending], kind="stable")][:n]
+        rows[adopted] = np.arange(first_row, first_row + len(adopted), dtype=rows.dtype)
+        self.df = self.df.assign(ROW=rows)
+
+    # --- DATE SLICES ---
+    def between(self, start, end):
+        # Rows with start <= DAY <= end; NO_DAY sorts last, so unparsed dates never match
+        # Keys are int32 like the column, or numpy would upcast the whole column on every search
+        days = self.df["DAY"].values
+        lo = days.searchsorted(np.int32(day_number(start)), "left")
+        hi = days.searchsorted(np.int32(day_number(end)), "right")
+        return self.df.iloc[lo:hi]
+
+    def on(self, day):
+        return self.between(day, day)
+
+    def this_week(self, now=None):
+        today = pd.Timestamp(now or datetime.now()).normalize()
+        return self.between(today - pd.Timedelta(days=today.weekday()), today)
+
+    def this_month(self, now=None):
+        today = pd.Timestamp(now or datetime.now()).normalize()
+        return self.between(today.replace(day=1), today + pd.offsets.MonthEnd(0))
+
+    def signature(self, row_number):
+        match = self.df[self.df["ROW"].values == row_number]
+        if match.empty:
+            return row_signature("", "", "", "", 0)
+        r = match.iloc[0]
+        return row_signature(r["DATE"], r["No"], r["ITEM"], r["ITEM CATEGORY"], r["CENTS"])
+
+    def today_total(self, now=None):
+        return self.rollups.day_total((now or datetime.now()).date())
+
+    def weekly_total(self, now=None):
+        return self.rollups.week_total((now or datetime.now()).date())
+
+    def monthly_total(self, now=None):
+        return self.rollups.month_total((now or datetime.now()).date())
+
+    def likely_items(self, now=None, top_n=5):
+        return self.frequencies.top((now or datetime.now()).weekday(), top_n)
+
+# --- LOCAL COLUMNAR CACHE ---
+# Bumped whenever the frame layout changes; caches written with another layout are ignored
+CACHE_VERSION = 2
+
+def save_parquet(ledger, path, meta):
+    table = pa.Table.from_pandas(ledger.df[ledger.df["ROW"] > 0], preserve_index=False)
+    meta = {**meta, "version": CACHE_VERSION}
+    table = table.replace_schema_metadata({**table.schema.metadata, b"ledger": json.dumps(meta).encode()})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+def load_parquet(path):
+    if not os.path.exists(path):
+        return None, None
+    table = pq.read_table(path, memory_map=True)
+    meta = json.loads(table.schema.metadata.get(b"ledger", b"{}"))
+    if meta.get("version") != CACHE_VERSION:
+        return None, None
+    ledger = Ledger([])
+    ledger.set_frame(table.to_pandas())
+    return ledger, meta
+
+# --- INCREMENTAL SYNC ---
+class SheetSync:
+    # Keeps a Ledger in step with the sheet by fetching only rows past the last synced row.
+    # Each refresh re-reads a few sampled rows in the same batch call; if any of them no longer
+    # match (edited or deleted rows shifted things around) it falls back to a full resync.
+    # Sampling misses most in-place edits (a corrected amount), so the whole sheet is also
+    # re-read once the last full sync is more than full_every seconds old (wall-clock time, kept
+    # in the Parquet cache so a restart does not hide edits older than its cache).
+    # With a cache_path the synced table is also kept on disk as Parquet, so a restarted
+    # process can serve the cached copy straight away and reconcile with the sheet afterwards.
+    # Every change is made to a copy of the ledger that is then swapped in whole, so readers
+    # always hold a complete snapshot. Refreshes read the sheet and build off self.lock, so
+    # submits never wait on the network, and a stale ledger keeps being served while a refresh
+    # catches up in the background; only the very first load blocks. prepare(ledger), if set, runs
+    # on each snapshot a refresh builds before it is swapped in (e.g. to build chart data).
+    def __init__(self, worksheet, samples=8, cache_path=None, full_every=3600):
+        self.worksheet = worksheet
+        self.samples = samples
+        self.full_every = full_every
+        self.cache_path = cache_path
+        self.ledger = None
+        self.last_row = 1
+        self.pending = []
+        self.flushes = 0
+        self.full_syncs = 0
+        self.full_synced_at = 0.0
+        self.refreshing = False
+        self.last_error = None
+        self.prepare = None
+        self.synced_at = 0.0
+        self.timings = {}
+        self.numbers = SequenceAllocator()
+        self.lock = threading.RLock()
+        self.refresh_lock = threading.RLock()
+
+    def get(self, max_age=600):
+        # Latest complete ledger; once it is older than max_age seconds a background refresh is
+        # started and this one is still returned
+        if self.ledger is None:
+            profiler.hit("ledger_cache", False)
+            with self.refresh_lock:
+                return self.ledger if self.ledger is not None else self.refresh()
+        stale = time.monotonic() - self.synced_at > max_age
+        profiler.hit("ledger_cache", not stale)
+        if stale:
+            self.refresh_in_background()
+        return self.ledger
+
+    def refresh(self):
+        # One refresh at a time. A flush confirmed while the sheet was being read moves the last
+        # row, so that read is thrown away and retried
+        with self.refresh_lock:
+            self.synced_at = time.monotonic()
+            start = time.perf_counter()
+            cold = self.ledger is None
+            for _ in range(3):
+                changed = self._sync(self.flushes)
+                if changed is not None:
+                    break
+            else:
+                # Flushes kept landing mid-read: hold them off for one last read
+                with self.lock:
+                    changed = self._sync(self.flushes)
+            self.timings["cold_start" if cold else "last_refresh"] = time.perf_counter() - start
+            if changed and self.cache_path:
+                with self.lock:
+                    ledger, meta = self.ledger, {"last_row": self.last_row, "full_synced_at": self.full_synced_at}
+                with profiler.span("cache.save_parquet"):
+                    save_parquet(ledger, self.cache_path, meta)
+            return self.ledger
+
+    def refresh_in_background(self, on_done=None):
+        # Starts a refresh on its own thread unless one is already running
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            finally:
+                self.refreshing = False
+                if on_done:
+                    on_done()
+        threading.Thread(target=run, daemon=True).start()
+
+    def load_cache(self):
+        if not self.cache_path:
+            return False
+        start = time.perf_counter()
+        try:
+            with profiler.span("cache.load_parquet"):
+                ledger, meta = load_parquet(self.cache_path)
+        except (OSError, ValueError, pa.ArrowException):
+            return False
+        if ledger is None:
+            return False
+        with self.lock:
+            ledger.extend(self.pending)
+            self.ledger, self.last_row = ledger, meta.get("last_row", 1 + len(ledger.df))
+            self.full_synced_at = meta.get("full_synced_at", 0.0)
+        self.timings["warm_start"] = time.perf_counter() - start
+        return True
+
+    def next_number(self, day, n=1):
+        # First of n transaction numbers ("No") for a date, without reading the sheet
+        return self.numbers.next(self.get(), day_number(day), n)
+
+    def add_pending(self, rows, journal=None):
+        # Patch rows accepted by the write-behind queue into the ledger before they reach the sheet.
+        # journal(rows) (WriteQueue.submit) runs under the same lock, so concurrent submits reach
+        # the journal in the order they were patched in and flushes adopt the right rows.
+        with self.lock:
+            self.pending.extend(rows)
+            if self.ledger is not None:
+                self._update(lambda ledger: ledger.extend(rows))
+            if journal:
+                journal(rows)
+
+    def confirm_flushed(self, rows, updated_range):
+        # Called once a batch of pending rows has been appended to the sheet at updated_range
+        with self.lock:
+            del self.pending[:len(rows)]
+            self.flushes += 1
+            if self.ledger is None:
+                return
+            match = re.search(r"[A-Z]+(\d+):[A-Z]+(\d+)$", updated_range or "")
+            if match and int(match.group(1)) == self.last_row + 1:
+                self._update(lambda ledger: ledger.adopt_pending(len(rows), self.last_row + 1))
+                self.last_row = int(match.group(2))
+            else:
+                # Someone else appended in between: resync on the next get() so their rows (and
+                # transaction numbers) are picked up straight away
+                self._update(lambda ledger: ledger.drop_pending(len(rows)))
+                self.synced_at = 0.0
+
+    def _update(self, change):
+        # Under self.lock: change(ledger) edits a copy that then replaces the current ledger
+        ledger = self.ledger.copy()
+        change(ledger)
+        self.ledger = ledger
+
+    def _sync(self, flushes):
+        # True if the ledger changed, False if not, None if a flush made the read stale
+        if self.ledger is None or time.time() - self.full_synced_at > self.full_every:
+            with profiler.span("sync.full"):
+                return self._full_sync(flushes)
+        with profiler.span("sync.incremental"):
+            return self._incremental_sync(flushes)
+
+    def _prepare(self, ledger):
+        if self.prepare:
+            with profiler.span("sync.prepare"):
+                self.prepare(ledger)
+
+    def _full_sync(self, flushes):
+        rows = fetch_rows(self.worksheet)
+        ledger = Ledger(rows)
+        with self.lock:
+            pending = list(self.pending)
+        ledger.extend(pending)
+        self._prepare(ledger)
+        with self.lock:
+            if self.flushes != flushes:
+                return None
+            # Until a flush, pending only grows: rows submitted while this was built go in now
+            ledger.extend(self.pending[len(pending):])
+            self.ledger, self.last_row = ledger, 1 + len(rows)
+            self.full_syncs += 1
+            self.full_synced_at = time.time()
+            return True
+
+    def _sample_rows(self, last_row):
+        if last_row < 2:
+            return []
+        middle = range(3, last_row)
+        picked = random.sample(middle, min(self.samples - 2, len(middle)))
+        return sorted({2, last_row, *picked})
+
+    def _incremental_sync(self, flushes):
+        with self.lock:
+            ledger, last_row = self.ledger, self.last_row
+        sampled = self._sample_rows(last_row)
+        ranges = [f"A{r}:I{r}" for r in sampled] + [f"A{last_row + 1}:I"]
+        results = self.worksheet.batch_get(ranges)
+        for row_number, values in zip(sampled, results):
+            if raw_signature(values[0] if values else []) != ledger.signature(row_number):
+                return self._full_sync(flushes)
+        new_rows = list(results[-1])
+        if new_rows:
+            updated = ledger.copy()
+            updated.extend(new_rows, last_row + 1)
+            self._prepare(updated)
+        with self.lock:
+            if self.flushes != flushes:
+                return None
+            if not new_rows:
+                return False
+            if self.ledger is ledger:
+                self.ledger = updated
+            else:
+                # Rows were submitted meanwhile: add the new rows to that ledger instead
+                self._update(lambda ledger: ledger.extend(new_rows, last_row + 1))
+            self.last_row = last_row + len(new_rows)
+            return True
+
+# --- BACKGROUND WORKERS ---
+class PeriodicWorker:
+    # Calls work() on a daemon thread every interval seconds, or sooner after wake(). Failures are
+    # kept in last_error and double the wait (up to max_backoff) until a run succeeds again.
+    # Subclasses set their own state before calling this __init__, which starts the thread.
+    def __init__(self, interval=60, max_backoff=600):
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.last_error = None
+        self.event = threading.Event()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def work(self):
+        raise NotImplementedError
+
+    def wake(self, *args):
+        self.event.set()
+
+    def _run(self):
+        backoff = self.interval
+        while True:
+            self.event.wait(timeout=backoff)
+            self.event.clear()
+            try:
+                self.work()
+                self.last_error, backoff = None, self.interval
+            except Exception as e:
+                self.last_error = e
+                backoff = min(backoff * 2, self.max_backoff)
+
+class Refresher(PeriodicWorker):
+    # Pulls sheet changes into a SheetSync every interval seconds, so page renders find the latest
+    # snapshot already built instead of paying for a sync themselves
+    def __init__(self, sync, interval=60, max_backoff=600):
+        self.sync = sync
+        self.refreshed_at = None
+        super().__init__(interval, max_backoff)
+
+    def work(self):
+        self.sync.refresh()
+        self.refreshed_at = time.time()
@@ -0,0 +1,61 @@
+from collections import Counter, defaultdict
+import numpy as np
+import pandas as pd
+from instrument import profiler
+from schema import NO_DAY, day_number, labels, weekdays
+
+# --- ITEM FREQUENCIES ---
+# Per-weekday item counters kept up to date as rows arrive (Ledger feeds every appended or
+# withdrawn frame through add()), so "what do I usually buy on a Tuesday" never rescans history.
+# Counts are also kept per part of day and with recency weights that halve every half_life days;
+# weights grow from a fixed epoch instead of decaying, so old counts never need rescaling.
+PARTS_OF_DAY = ["morning", "afternoon", "evening"]
+EPOCH = day_number("2000-01-01")
+
+def part_of_day(hours):
+    return np.select([hours < 12, hours < 17], ["morning", "afternoon"], "evening")
+
+class ItemFrequencies:
+    def __init__(self, half_life=90):
+        self.half_life = half_life
+        self.counts = defaultdict(Counter)
+        self.weighted = defaultdict(Counter)
+        self.names = {}
+        self._top = {}
+
+    def add(self, df, sign=1):
+        items, keys = labels(df["ITEM"]), labels(df["ITEM"], lower=True)
+        days = df["DAY"].values
+        keep = (days != NO_DAY) & (keys != "")
+        if not keep.any():
+            return
+        items, keys, days = items[keep], keys[keep], days[keep]
+        self.names.update(zip(keys, items))
+        # Hours are parsed once per distinct TIME value
+        times = df["TIME"].cat.categories.astype(str).str.extract(r"^\s*(\d{1,2})", expand=False)
+        hours = pd.to_numeric(times, errors="coerce")
+        parts = np.where(hours.isna(), "", part_of_day(hours.fillna(0)))[df["TIME"].cat.codes.values[keep]]
+        weights = np.exp2((days.astype("int64") - EPOCH) / self.half_life)
+        grouped = pd.Series(weights).groupby([weekdays(days), parts, keys]).agg(["size", "sum"])
+        for (weekday, part, item), count, weight in zip(grouped.index, grouped["size"], grouped["sum"]):
+            for key in ((weekday, None), (weekday, part)) if part else ((weekday, None),):
+                self.counts[key][item] += sign * int(count)
+                self.weighted[key][item] += sign * weight
+                self._top.pop((key, False), None)
+                self._top.pop((key, True), None)
+
+    def copy(self):
+        other = ItemFrequencies(self.half_life)
+        other.counts = defaultdict(Counter, {k: c.copy() for k, c in self.counts.items()})
+        other.weighted = defaultdict(Counter, {k: c.copy() for k, c in self.weighted.items()})
+        other.names, other._top = dict(self.names), dict(self._top)
+        return other
+
+    def top(self, weekday, n=5, part=None, recency=False):
+        # Cached per (weekday, part); only the counters touched by the last add() are recomputed
+        key = (weekday, part)
+        profiler.hit("recommend.top_cache", (key, recency) in self._top)
+        if (key, recency) not in self._top:
+            counter = (self.weighted if recency else self.counts).get(key, Counter())
+            self._top[(key, recency)] = [item for item, c in counter.most_common() if c > 1e-9]
+        return [self.names[item] for item in self._top[(key, recency)][:n]]
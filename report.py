@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+from budgets import ledger_budgets
+from dashboard import budget_status
+from ledger import EXCLUDED_CATEGORIES, Refresher, SheetSync
+from schema import labels
+
+# --- HEADLESS REPORTS ---
+# Totals, top items and budget status for scripts, cron jobs and exports, without Streamlit or
+# the chart libraries. The ledger is the app's own Parquet cache (.cache/<ledger>/ledger.parquet)
+# brought up to date with an incremental sync (skipped with --offline), and totals come from its
+# rollups, so reports over years of history cost a cache load and a couple of API calls.
+#   python report.py totals --period month --by-category --start 2025-01-01 --format csv
+#   python report.py top-items --start 2025-06-01 --n 20 --category Food
+#   python report.py budgets --format json --ledger home --offline
+#   python report.py serve --port 8502    # GET /totals, /top-items, /budgets, /health as JSON
+# --ledger, --secrets, --offline and --format go before or after the report name.
+# The HTTP endpoint takes the same options as query parameters (?period=week&by_category=1),
+# plus ledger=<name>; each ledger is opened on first use and kept fresh by a Refresher.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+PERIODS = {"day": "D", "week": "W-SUN", "month": "M", "year": "Y"}
+QUERIES = ["totals", "top-items", "budgets"]
+
+def parse_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+def is_set(value):
+    return value is True or str(value).strip().lower() in ("1", "true", "yes")
+
+def totals(ledger, period="month", start=None, end=None, by_category=False, category=None, include_excluded=False):
+    # Spending per period (and per category), from the rollups without touching the rows
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+    cells = ledger.rollups.by_day_category
+    frame = pd.DataFrame(list(cells), columns=["Date", "Category"])
+    frame["Amount"] = np.fromiter(cells.values(), dtype="int64", count=len(cells)) / 100
+    frame["Date"] = pd.to_datetime(frame["Date"])
+    keep = frame["Amount"] != 0
+    if start:
+        keep &= frame["Date"] >= pd.Timestamp(parse_date(start))
+    if end:
+        keep &= frame["Date"] <= pd.Timestamp(parse_date(end))
+    if category:
+        keep &= frame["Category"] == category.strip().lower()
+    elif not include_excluded:
+        keep &= ~frame["Category"].isin(EXCLUDED_CATEGORIES)
+    frame = frame[keep]
+    # Rollups keep categories lower-cased; show them as they are written in the sheet
+    names = {c.strip().lower(): c.strip() for c in ledger.df["ITEM CATEGORY"].cat.categories}
+    keys = [frame["Date"].dt.to_period(PERIODS[period]).dt.start_time.dt.strftime("%Y-%m-%d").rename("Period")]
+    if by_category:
+        keys.append(frame["Category"].map(lambda c: names.get(c, c)))
+    return frame.groupby(keys)["Amount"].sum().round(2).reset_index()
+
+def top_items(ledger, start=None, end=None, n=10, category=None, by="amount", include_excluded=False):
+    # Most bought items between two dates, by total amount or by number of purchases
+    if by not in ("amount", "count"):
+        raise ValueError("by must be amount or count")
+    rows = ledger.between(parse_date(start) or pd.Timestamp.min, parse_date(end) or pd.Timestamp.max)
+    # Filters and grouping work on category codes; only the per-label table is turned into text
+    categories = rows["ITEM CATEGORY"].cat.categories.str.strip().str.lower()
+    if category:
+        wanted = categories == category.strip().lower()
+    else:
+        wanted = ~categories.isin([] if include_excluded else EXCLUDED_CATEGORIES)
+    keep = np.asarray(wanted)[rows["ITEM CATEGORY"].cat.codes.values]
+    keep &= np.asarray(rows["ITEM"].cat.categories.str.strip() != "")[rows["ITEM"].cat.codes.values]
+    rows = rows[keep]
+    per_label = pd.DataFrame({"Count": 1, "Amount": rows["CENTS"].values, "Last": np.arange(len(rows))}).groupby(
+        rows["ITEM"].cat.codes.values).agg({"Count": "sum", "Amount": "sum", "Last": "max"}).sort_values("Last")
+    # Spellings of an item are merged; its name and category are the ones written last
+    last = rows.iloc[per_label["Last"].values]
+    per_label = per_label.assign(Key=labels(last["ITEM"], lower=True), Item=labels(last["ITEM"]),
+                                 Category=labels(last["ITEM CATEGORY"]))
+    grouped = per_label.groupby("Key", sort=False).agg({"Item": "last", "Category": "last", "Count": "sum", "Amount": "sum"})
+    grouped["Amount"] = grouped["Amount"] / 100
+    order = ["Amount", "Count"] if by == "amount" else ["Count", "Amount"]
+    return grouped.sort_values(order, ascending=False).head(int(n)).reset_index(drop=True)
+
+def answer(ledger, budgets, query, options):
+    # One report as a DataFrame; options are the CLI flags or the HTTP query parameters
+    get = lambda name, default=None: options.get(name) if options.get(name) not in (None, "") else default
+    if query == "totals":
+        return totals(ledger, get("period", "month"), get("start"), get("end"), is_set(get("by_category", False)),
+                      get("category"), is_set(get("all", False)))
+    if query == "top-items":
+        return top_items(ledger, get("start"), get("end"), get("n", 10), get("category"), get("by", "amount"),
+                         is_set(get("all", False)))
+    if query == "budgets":
+        day = parse_date(get("date"))
+        return budget_status(ledger, budgets, datetime.combine(day, datetime.min.time()) if day else None)
+    raise ValueError(f"Unknown report {query!r}; try {', '.join(QUERIES)}")
+
+def write(frame, fmt, out=sys.stdout):
+    if fmt == "json":
+        out.write(frame.to_json(orient="records", indent=2, double_precision=4) + "\n")
+    elif fmt == "csv":
+        frame.to_csv(out, index=False)
+    else:
+        out.write((frame.to_string(index=False) if not frame.empty else "(no rows)") + "\n")
+
+class Reports:
+    # Ledgers opened on first use, each from its cached copy and synced with its storage (unless
+    # offline); served ledgers are kept fresh by a Refresher and budgets are re-read every 10 minutes
+    def __init__(self, secrets, offline=False, refresh=False):
+        from backend import ledger_configs
+        self.secrets = secrets
+        self.configs = ledger_configs(secrets)
+        self.offline = offline
+        self.refresh = refresh
+        self.syncs = {}
+        self.budgets = {}
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def _worksheet(self, url, name):
+        from backend import WorksheetPool
+        if self.pool is None:
+            self.pool = WorksheetPool(self.secrets["gcp_service_account"])
+        return self.pool.worksheet(url, name)
+
+    def _storage(self, name):
+        config = self.configs[name]
+        if config["storage"] == "sqlite":
+            from storage import SQLiteStorage
+            return SQLiteStorage(config["sqlite_path"] or os.path.join(CACHE_DIR, name, "ledger.sqlite3"))
+        return self._worksheet(config["url"], config["worksheet"])
+
+    def _open(self, name):
+        sync = SheetSync(None, cache_path=os.path.join(CACHE_DIR, name, "ledger.parquet"))
+        cached = sync.load_cache()
+        if self.offline:
+            if not cached:
+                raise LookupError(f"No cached copy of ledger {name!r}; run once without --offline")
+            return sync
+        sync.worksheet = self._storage(name)
+        sync.refresh()
+        if self.refresh:
+            Refresher(sync, interval=self.configs[name]["refresh_interval"])
+        return sync
+
+    def get(self, name):
+        # (ledger, budgets) for a ledger name
+        if name not in self.configs:
+            raise LookupError(f"Unknown ledger {name!r}; configured: {', '.join(self.configs)}")
+        with self.lock:
+            if name not in self.syncs:
+                self.syncs[name] = self._open(name)
+            loaded_at, budgets = self.budgets.get(name, (None, None))
+            if loaded_at is None or time.monotonic() - loaded_at > 600:
+                budgets, problems = ledger_budgets(self.configs[name], None if self.offline else self._worksheet)
+                for problem in problems:
+                    print(f"{name}: {problem}", file=sys.stderr)
+                self.budgets[name] = (time.monotonic(), budgets)
+        sync = self.syncs[name]
+        return (sync.ledger if self.offline else sync.get(max_age=600)), budgets
+
+def serve(reports, default_ledger, host, port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            options = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            query = url.path.strip("/")
+            if query not in QUERIES + ["health"]:
+                return self._send(404, {"error": f"Unknown report {query!r}; try {', '.join(QUERIES)} or health"})
+            try:
+                ledger, budgets = reports.get(options.get("ledger", default_ledger))
+                if query == "health":
+                    body = {"rows": len(ledger.df), "version": ledger.version}
+                else:
+                    body = json.loads(answer(ledger, budgets, query, options).to_json(orient="records", double_precision=4))
+                self._send(200, body)
+            except (LookupError, ValueError) as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                # Sync or storage failures: answer in JSON rather than dropping the connection
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving reports on http://{host}:{port}/ (totals, top-items, budgets, health)")
+    server.serve_forever()
+
+def main():
+    from backend import load_secrets
+
+    def shared(suppress):
+        # Options every command takes, before or after its name; the per-command copies default to
+        # SUPPRESS so they only override what was given before the command
+        default = lambda value: argparse.SUPPRESS if suppress else value
+        options = argparse.ArgumentParser(add_help=False)
+        options.add_argument("--ledger", default=default("default"))
+        options.add_argument("--secrets", default=default(os.path.join(".streamlit", "secrets.toml")))
+        options.add_argument("--offline", action="store_true", default=default(False),
+                             help="use the cached ledger as is, without syncing")
+        options.add_argument("--format", choices=["table", "csv", "json"], default=default("table"))
+        return options
+
+    parser = argparse.ArgumentParser(description="Spending reports without the Streamlit UI", parents=[shared(False)])
+    commands = parser.add_subparsers(dest="query", required=True)
+    common = shared(True)
+    filters = argparse.ArgumentParser(add_help=False, parents=[common])
+    filters.add_argument("--start", help="first date, YYYY-MM-DD")
+    filters.add_argument("--end", help="last date, YYYY-MM-DD")
+    filters.add_argument("--category")
+    filters.add_argument("--all", action="store_true", help="include savings and income")
+    totals_command = commands.add_parser("totals", parents=[filters], help="spending per period")
+    totals_command.add_argument("--period", choices=list(PERIODS), default="month")
+    totals_command.add_argument("--by-category", action="store_true")
+    top_command = commands.add_parser("top-items", parents=[filters], help="most bought items")
+    top_command.add_argument("--n", type=int, default=10)
+    top_command.add_argument("--by", choices=["amount", "count"], default="amount")
+    budgets_command = commands.add_parser("budgets", parents=[common], help="budget status for the periods containing a date")
+    budgets_command.add_argument("--date", help="YYYY-MM-DD, defaults to today")
+    serve_command = commands.add_parser("serve", parents=[common], help="answer the same reports over HTTP as JSON")
+    serve_command.add_argument("--host", default="127.0.0.1")
+    serve_command.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    secrets = load_secrets(args.secrets) if os.path.exists(args.secrets) else {}
+    if args.query == "serve":
+        return serve(Reports(secrets, args.offline, refresh=not args.offline), args.ledger, args.host, args.port)
+    try:
+        ledger, budgets = Reports(secrets, args.offline).get(args.ledger)
+        write(answer(ledger, budgets, args.query, vars(args)), args.format)
+    except (LookupError, ValueError) as e:
+        raise SystemExit(str(e))
+
+if __name__ == "__main__":
+    main()
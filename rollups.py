@@ -0,0 +1,54 @@
+from collections import defaultdict
+from datetime import timedelta
+import pandas as pd
+from schema import NO_DAY, day_date, labels
+
+# --- ROLLUPS ---
+# Running totals keyed by (date, category), with day/week/month totals derived as rows arrive.
+# Ledger feeds every appended (or withdrawn) frame through add(), so metric lookups never
+# rescan the table. Categories are stored lower-cased; excluded ones (savings, income) are
+# kept per category but left out of the spending totals. Sums are kept in integer cents, so
+# adding and withdrawing rows never drifts.
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+class Rollups:
+    def __init__(self, excluded=()):
+        self.excluded = set(excluded)
+        self.by_day_category = defaultdict(int)
+        self.by_month_category = defaultdict(int)
+        self.day_totals = defaultdict(int)
+        self.week_totals = defaultdict(int)
+        self.month_totals = defaultdict(int)
+
+    def add(self, df, sign=1):
+        dated = df[df["DAY"].values != NO_DAY]
+        if dated.empty:
+            return
+        grouped = pd.Series(dated["CENTS"].values).groupby(
+            [dated["DAY"].values, labels(dated["ITEM CATEGORY"], lower=True)]
+        ).sum()
+        for (day, category), cents in grouped.items():
+            day, amount = day_date(day), sign * int(cents)
+            self.by_day_category[(day, category)] += amount
+            self.by_month_category[(day.year, day.month, category)] += amount
+            if category in self.excluded:
+                continue
+            self.day_totals[day] += amount
+            self.week_totals[week_start(day)] += amount
+            self.month_totals[(day.year, day.month)] += amount
+
+    def copy(self):
+        other = Rollups(self.excluded)
+        for name in ("by_day_category", "by_month_category", "day_totals", "week_totals", "month_totals"):
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    def day_total(self, day):
+        return self.day_totals.get(day, 0) / 100
+
+    def week_total(self, day):
+        return self.week_totals.get(week_start(day), 0) / 100
+
+    def month_total(self, day):
+        return self.month_totals.get((day.year, day.month), 0) / 100
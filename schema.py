@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+# --- SCHEMA ---
+# Ledger frames are compact: the text columns are categoricals (a few thousand distinct items,
+# dates and times repeated across millions of rows), DATE is parsed once into DAY, an int32 count
+# of days since 1970-01-01 (NO_DAY for unparseable dates, so they sort last), and amounts are
+# exact int64 CENTS. Anything derived per value (parsed dates, hours, lower-cased names) is
+# computed once per category and spread over the rows through the category codes.
+HEADERS = ["DATE", "No", "TIME", "ITEM", "ITEM CATEGORY", "No of ITEM", "Amount Spent", "WEEK", "MONTH"]
+TEXT_COLUMNS = ["DATE", "No", "TIME", "ITEM", "ITEM CATEGORY", "No of ITEM", "WEEK", "MONTH"]
+NO_DAY = np.iinfo(np.int32).max
+EPOCH = date(1970, 1, 1)
+
+def day_number(d):
+    return (pd.Timestamp(d).date() - EPOCH).days
+
+def day_date(n):
+    return EPOCH + timedelta(days=int(n))
+
+def day_dates(days):
+    # DAY ordinals as datetime64 values (NaT for NO_DAY)
+    days = np.asarray(days)
+    return np.where(days == NO_DAY, np.datetime64("NaT", "D"), days.astype("datetime64[D]")).astype("datetime64[ns]")
+
+def weekdays(days):
+    # Monday == 0, like date.weekday(); 1970-01-01 was a Thursday
+    return (np.asarray(days, dtype="int64") + 3) % 7
+
+def labels(column, lower=False):
+    # Stripped (optionally lower-cased) text of a categorical column as an object array
+    categories = column.cat.categories.astype(str).str.strip()
+    if lower:
+        categories = categories.str.lower()
+    return np.asarray(categories, dtype=object)[column.cat.codes.values]
+
+def to_amount(series):
+    cleaned = series.astype(str).str.replace(r"[,₦\s]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64")
+
+def to_cents(series):
+    # Blank or unparseable amounts count as 0, as they always did in the totals
+    return (to_amount(series) * 100).round().fillna(0).astype("int64")
+
+def parse_days(series):
+    dates = pd.to_datetime(series, format="%m/%d/%Y", errors="coerce")
+    return np.where(dates.isna(), NO_DAY, (dates - pd.Timestamp(EPOCH)).dt.days.fillna(0)).astype("int32")
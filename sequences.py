@@ -0,0 +1,47 @@
+import threading
+import numpy as np
+import pandas as pd
+from schema import NO_DAY
+
+# --- DAY SEQUENCES ---
+# Highest transaction number ("No") per day, kept up to date as rows arrive like the other ledger
+# indexes, so rows written by anyone else raise it as soon as a sync brings them in. Numbers are
+# never given back: withdrawn rows leave their day's highest number where it was.
+class DaySequences:
+    def __init__(self):
+        self.highest = {}
+
+    def add(self, df, sign=1):
+        if sign < 0 or df.empty:
+            return
+        numbers = pd.to_numeric(df["No"].cat.categories.astype(str).str.strip(), errors="coerce")
+        numbers = np.asarray(numbers, dtype="float64")[df["No"].cat.codes.values]
+        days = df["DAY"].values
+        keep = (days != NO_DAY) & ~np.isnan(numbers)
+        highest = pd.Series(numbers[keep]).groupby(days[keep]).max()
+        for day, number in highest.items():
+            if number > self.highest.get(day, 0):
+                self.highest[day] = int(number)
+
+    def copy(self):
+        other = DaySequences()
+        other.highest = dict(self.highest)
+        return other
+
+    def last(self, day):
+        return self.highest.get(day, 0)
+
+class SequenceAllocator:
+    # Hands out the next numbers for a day. One allocator is shared by every session writing to a
+    # ledger, so concurrent submits never get the same number; it remembers what it handed out
+    # until the ledger has seen it, even across a ledger rebuilt by a full resync.
+    def __init__(self):
+        self.issued = {}
+        self.lock = threading.Lock()
+
+    def next(self, ledger, day, n=1):
+        # First of n consecutive numbers for day (a DAY ordinal)
+        with self.lock:
+            first = max(ledger.sequences.last(day), self.issued.get(day, 0)) + 1
+            self.issued[day] = first + n - 1
+            return first
@@ -0,0 +1,202 @@
+import argparse
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from ledger import HEADERS, PeriodicWorker, fetch_rows
+
+# --- STORAGE INTERFACE ---
+# What the app needs from a ledger backend. Rows are lists of strings in HEADERS order and keep
+# the sheet's row numbering (header is row 1, data starts at row 2), so SheetSync and WriteQueue
+# run unchanged on top of any backend.
+RANGE = re.compile(r"^[A-Z]+(\d+):[A-Z]+(\d*)$")
+
+def parse_range(a1):
+    match = RANGE.match(a1.split("!")[-1])
+    if not match:
+        raise ValueError(f"Unsupported range: {a1}")
+    return int(match.group(1)), int(match.group(2)) if match.group(2) else None
+
+def parse_day(value):
+    try:
+        return datetime.strptime(str(value).strip(), "%m/%d/%Y").date()
+    except ValueError:
+        return None
+
+def iso_day(value):
+    day = parse_day(value)
+    return day.isoformat() if day else None
+
+# No, No of ITEM and Amount Spent are numbers in the sheet (the form writes them as such, and
+# SUMs and pivots skip text cells); rows from SQLite or an import carry them as text
+NUMBER_COLUMNS = [HEADERS.index(name) for name in ("No", "No of ITEM", "Amount Spent")]
+
+def sheet_number(value):
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        number = float(str(value).strip().replace(",", ""))
+    except ValueError:
+        return value
+    if not math.isfinite(number):
+        return value
+    return int(number) if number.is_integer() else number
+
+def sheet_row(row):
+    return [sheet_number(v) if i in NUMBER_COLUMNS else v for i, v in enumerate(row)]
+
+class Storage:
+    def get_all_values(self):
+        raise NotImplementedError
+
+    def batch_get(self, ranges):
+        raise NotImplementedError
+
+    def append_rows(self, rows):
+        raise NotImplementedError
+
+    def query(self, start, end, category=None):
+        raise NotImplementedError
+
+    def row_count(self):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def read_range(self, start, end=None):
+        return list(self.batch_get([f"A{start}:I{end or ''}"])[0])
+
+# --- GOOGLE SHEETS ---
+class SheetsStorage(Storage):
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+
+    def get_all_values(self):
+        return self.worksheet.get_all_values()
+
+    def batch_get(self, ranges):
+        return self.worksheet.batch_get(ranges)
+
+    def append_rows(self, rows):
+        return self.worksheet.append_rows([sheet_row(r) for r in rows])
+
+    def query(self, start, end, category=None):
+        # No server-side filtering on a sheet: download once and filter locally
+        category = category.lower() if category else None
+        return [r for r in fetch_rows(self.worksheet)
+                if (d := parse_day(r[0])) and start <= d <= end
+                and (category is None or r[4].strip().lower() == category)]
+
+    def row_count(self):
+        return max(len(self.worksheet.col_values(1)) - 1, 0)
+
+    def clear(self):
+        self.worksheet.batch_clear(["A2:I"])
+
+# --- SQLITE ---
+class SQLiteStorage(Storage):
+    COLUMNS = ["date", "no", "time", "item", "category", "qty", "amount", "week", "month"]
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS ledger (row INTEGER PRIMARY KEY, day TEXT, "
+            + ", ".join(f"{c} TEXT NOT NULL DEFAULT ''" for c in self.COLUMNS) + ")"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS ledger_day ON ledger (day)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS ledger_category_day ON ledger (category COLLATE NOCASE, day)")
+        self.lock = threading.Lock()
+
+    def _select(self, where="", params=()):
+        with self.lock:
+            cur = self.db.execute(f"SELECT {', '.join(self.COLUMNS)} FROM ledger {where}", params)
+            return [list(r) for r in cur.fetchall()]
+
+    def get_all_values(self):
+        return [list(HEADERS)] + self._select("ORDER BY row")
+
+    def batch_get(self, ranges):
+        results = []
+        for a1 in ranges:
+            start, end = parse_range(a1)
+            rows = [list(HEADERS)] if start <= 1 <= (end or start) else []
+            rows += self._select("WHERE row BETWEEN ? AND ? ORDER BY row", (max(start, 2), end or 2 ** 62))
+            results.append(rows)
+        return results
+
+    def append_rows(self, rows):
+        width = len(HEADERS)
+        rows = [([str(v) for v in r] + [""] * width)[:width] for r in rows]
+        with self.lock:
+            first = (self.db.execute("SELECT MAX(row) FROM ledger").fetchone()[0] or 1) + 1
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                f"INSERT INTO ledger (row, day, {', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * (width + 2))})",
+                [(first + i, iso_day(r[0]), *r) for i, r in enumerate(rows)],
+            )
+            self.db.execute("COMMIT")
+        return {"updates": {"updatedRange": f"ledger!A{first}:I{first + len(rows) - 1}"}}
+
+    def query(self, start, end, category=None):
+        where, params = "WHERE day BETWEEN ? AND ?", [str(start), str(end)]
+        if category:
+            where, params = where + " AND category = ? COLLATE NOCASE", params + [category]
+        return self._select(where + " ORDER BY day, row", params)
+
+    def row_count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM ledger").fetchone()[0]
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM ledger")
+
+# --- MIGRATION / MIRRORING ---
+def sync_storage(source, target, full=False, batch_size=500):
+    # Copy the rows target is missing (ledgers are append-only); full=True rebuilds target first
+    if full:
+        target.clear()
+    have = target.row_count()
+    rows = source.read_range(have + 2)
+    for i in range(0, len(rows), batch_size):
+        target.append_rows(rows[i:i + batch_size])
+    return len(rows)
+
+class StorageMirror(PeriodicWorker):
+    # Background copy of a primary store (e.g. SQLite) into a mirror (e.g. the Google Sheet)
+    def __init__(self, primary, mirror, interval=60, max_backoff=600):
+        self.primary = primary
+        self.mirror = mirror
+        super().__init__(interval, max_backoff)
+
+    def work(self):
+        sync_storage(self.primary, self.mirror)
+
+def main():
+    from backend import WorksheetPool, ledger_configs, load_secrets
+
+    parser = argparse.ArgumentParser(description="Copy a ledger between its Google Sheet and a SQLite file")
+    parser.add_argument("sqlite_path")
+    parser.add_argument("--ledger", default="default")
+    parser.add_argument("--secrets", default=os.path.join(".streamlit", "secrets.toml"))
+    parser.add_argument("--to-sheet", action="store_true", help="copy SQLite rows into the sheet instead")
+    parser.add_argument("--full", action="store_true", help="clear the target and copy everything")
+    args = parser.parse_args()
+
+    secrets = load_secrets(args.secrets)
+    config = ledger_configs(secrets)[args.ledger]
+    sheet = SheetsStorage(WorksheetPool(secrets["gcp_service_account"]).worksheet(config["url"], config["worksheet"]))
+    local = SQLiteStorage(args.sqlite_path)
+    source, target = (local, sheet) if args.to_sheet else (sheet, local)
+    start = time.perf_counter()
+    copied = sync_storage(source, target, full=args.full)
+    print(f"Copied {copied} rows in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from gspread.exceptions import APIError
+
+# --- WRITE-BEHIND QUEUE ---
+# Submitted rows are journaled to SQLite and acknowledged straight away; a background worker
+# appends everything pending to the sheet with one append_rows call per batch. Rows stay in the
+# journal until the sheet accepts them, so nothing is lost if the process restarts mid-flush.
+# The target can be a worksheet or any storage.Storage backend. Appends are spaced at least
+# min_interval seconds apart, so a large backlog (a bulk import) drains within the Sheets write
+# quota of 60 requests a minute instead of running into 429s.
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def is_retryable(error):
+    if isinstance(error, APIError):
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, (OSError, sqlite3.OperationalError))
+
+class WriteQueue:
+    def __init__(self, path, worksheet, on_flushed=None, batch_size=500, max_backoff=60, min_interval=1.0):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS pending (id INTEGER PRIMARY KEY AUTOINCREMENT, row TEXT NOT NULL, created REAL NOT NULL)")
+        self.worksheet = worksheet
+        self.on_flushed = on_flushed
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.min_interval = min_interval
+        self.last_append = 0.0
+        self.last_error = None
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.wake.set()
+        self.worker.start()
+
+    def submit(self, rows):
+        # One transaction per submit; in autocommit mode every row would be its own commit
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT INTO pending (row, created) VALUES (?, ?)",
+                [(json.dumps(row), time.time()) for row in rows],
+            )
+            self.db.execute("COMMIT")
+        self.wake.set()
+
+    def pending_rows(self, limit=-1):
+        with self.lock:
+            cur = self.db.execute("SELECT id, row FROM pending ORDER BY id LIMIT ?", (limit,))
+            return [(row_id, json.loads(row)) for row_id, row in cur.fetchall()]
+
+    def pending_count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def flush(self):
+        # Append one batch of pending rows; returns how many rows reached the sheet
+        batch = self.pending_rows(self.batch_size)
+        if not batch:
+            return 0
+        rows = [row for _, row in batch]
+        time.sleep(max(0.0, self.last_append + self.min_interval - time.monotonic()))
+        self.last_append = time.monotonic()
+        response = self.worksheet.append_rows(rows)
+        with self.lock:
+            self.db.execute("DELETE FROM pending WHERE id <= ?", (batch[-1][0],))
+        if self.on_flushed:
+            self.on_flushed(rows, (response or {}).get("updates", {}).get("updatedRange"))
+        return len(rows)
+
+    def _run(self):
+        backoff = 1
+        while True:
+            self.wake.wait(timeout=30)
+            self.wake.clear()
+            try:
+                while self.flush():
+                    pass
+                self.last_error, backoff = None, 1
+            except Exception as e:
+                # Anything else (auth refresh failures, a bug in on_flushed) must not kill the
+                # worker: non-retryable errors are tried again on the next wake or timeout
+                self.last_error = e
+                if not is_retryable(e):
+                    continue
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                self.wake.set()